@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import date
-from typing import Any
+from typing import Any, AsyncIterator, Iterator, Sequence
 
+from app.breaker import CircuitBreaker, CircuitOpenError, RetryBudget, backoff_delay
+from app.cache import PendingResults, SingleFlight, get_strategy_cache, strategy_cache_key
+from app.metrics import observe, registry, timed
 from app.models import PlannerRequest, StrategyResponse
-
-try:
-    from openai import OpenAI
-except ImportError:  # pragma: no cover
-    OpenAI = None  # type: ignore[assignment]
+from app.scoring import phase_for_days_left, rank_subject_batches
+from app.streaming import StrategySectionParser
 
 
 SYSTEM_PROMPT = """You are an expert academic strategy coach.
@@ -20,16 +25,8 @@ Output JSON with keys:
 summary, next_steps, weekly_plan, risk_alerts, focus_subjects.
 Each list should contain 3 to 5 short string items.
 """
-
-
-def _subject_priority(subject: Any) -> float:
-    gap = max(subject.target_level - subject.current_level, 0)
-    return (
-        gap * 0.42
-        + subject.priority * 10
-        + (100 - subject.syllabus_coverage) * 0.26
-        + (100 - subject.mock_score) * 0.22
-    )
+STRATEGY_SECTIONS = ("summary", "next_steps", "weekly_plan", "risk_alerts", "focus_subjects")
+SYSTEM_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:12]
 
 
 def _safe_target_date(target_date: str) -> date | None:
@@ -45,75 +42,17 @@ def _exam_window(payload: PlannerRequest) -> tuple[int | None, str]:
         return None, "Preparation"
 
     days_left = (target - date.today()).days
-    if days_left <= 30:
-        return days_left, "Final revision"
-    if days_left <= 75:
-        return days_left, "Acceleration"
-    if days_left <= 150:
-        return days_left, "Build-up"
-    return days_left, "Foundation"
-
-
-def _subject_readiness(subject: Any) -> int:
-    readiness = (
-        subject.current_level * 0.42
-        + subject.mock_score * 0.34
-        + subject.syllabus_coverage * 0.24
-    )
-    return round(min(100, max(0, readiness)))
-
-
-def _focus_mode(payload: PlannerRequest, subject: Any) -> str:
-    if payload.study_style == "Concept-first" or subject.syllabus_coverage < 45:
-        return "concept rebuild"
-    if payload.study_style == "Practice-heavy" or subject.mock_score < 55:
-        return "timed drilling"
-    return "mixed revision"
-
-
-def _allocate_hours(total_hours: int, ranked_subjects: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    if not ranked_subjects:
-        return []
-
-    total_weight = sum(subject["pressure"] for subject in ranked_subjects) or 1
-    remaining = total_hours
-    allocated: list[dict[str, Any]] = []
-
-    for index, subject in enumerate(ranked_subjects):
-        if index == len(ranked_subjects) - 1:
-            hours = max(1, remaining)
-        else:
-            proportional = round((subject["pressure"] / total_weight) * total_hours)
-            hours = max(1, proportional)
-            remaining -= hours
+    return days_left, phase_for_days_left(days_left)
 
-        allocated.append({**subject, "hours": hours})
 
-    return allocated
+def _build_ranked_subjects(payload: PlannerRequest) -> list[dict[str, Any]]:
+    return rank_subject_batches([payload])[0]
 
 
-def _build_ranked_subjects(payload: PlannerRequest) -> list[dict[str, Any]]:
-    ranked = []
-    for subject in payload.subjects:
-        gap = max(subject.target_level - subject.current_level, 0)
-        pressure = _subject_priority(subject)
-        readiness = _subject_readiness(subject)
-        ranked.append(
-            {
-                "name": subject.name,
-                "priority": subject.priority,
-                "coverage": subject.syllabus_coverage,
-                "mock_score": subject.mock_score,
-                "current_level": subject.current_level,
-                "target_level": subject.target_level,
-                "gap": gap,
-                "pressure": pressure,
-                "readiness": readiness,
-                "mode": _focus_mode(payload, subject),
-            }
-        )
-    ranked.sort(key=lambda entry: entry["pressure"], reverse=True)
-    return _allocate_hours(payload.weekly_hours, ranked)
+def _supporting_subjects(ranked_subjects: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    # With fewer weekly hours than subjects the lowest-ranked ones get 0h; they are left out
+    # rather than given a block of no time.
+    return [subject for subject in ranked_subjects[1:] if subject["hours"] > 0]
 
 
 def _weekly_micro_plan(
@@ -131,8 +70,9 @@ def _weekly_micro_plan(
 
     weeks_visible = 2 if days_left is not None and days_left <= 21 else 3 if days_left is not None and days_left <= 60 else 4
     primary = ranked_subjects[0]
-    secondary = ranked_subjects[1] if len(ranked_subjects) > 1 else None
-    tertiary = ranked_subjects[2] if len(ranked_subjects) > 2 else None
+    supporting = _supporting_subjects(ranked_subjects)
+    secondary = supporting[0] if supporting else None
+    tertiary = supporting[1] if len(supporting) > 1 else None
 
     plan: list[str] = []
     for week in range(1, weeks_visible + 1):
@@ -167,8 +107,13 @@ def _weekly_micro_plan(
     return plan
 
 
-def build_fallback_strategy(payload: PlannerRequest) -> StrategyResponse:
-    ranked_subjects = _build_ranked_subjects(payload)
+@timed("fallback_strategy")
+def build_fallback_strategy(
+    payload: PlannerRequest,
+    ranked_subjects: list[dict[str, Any]] | None = None,
+) -> StrategyResponse:
+    if ranked_subjects is None:
+        ranked_subjects = _build_ranked_subjects(payload)
     top_subjects = [subject["name"] for subject in ranked_subjects[:3]]
     avg_readiness = (
         round(sum(subject["readiness"] for subject in ranked_subjects) / len(ranked_subjects))
@@ -192,14 +137,21 @@ def build_fallback_strategy(payload: PlannerRequest) -> StrategyResponse:
 
     if ranked_subjects:
         primary = ranked_subjects[0]
-        secondary = ranked_subjects[1] if len(ranked_subjects) > 1 else None
+        supporting = _supporting_subjects(ranked_subjects)
+        secondary = supporting[0] if supporting else None
+        if secondary:
+            second_step = f"Use your second block on {secondary['name']} for {secondary['hours']}h/week and convert every mock mistake into a short revision note."
+        elif len(ranked_subjects) > 1:
+            unscheduled = " and ".join(subject["name"] for subject in ranked_subjects[1:])
+            second_step = (
+                f"Your weekly hours only cover {primary['name']}, so {unscheduled} stay unscheduled; "
+                "keep them alive with short recall sessions until you can add study time."
+            )
+        else:
+            second_step = "Add one supporting subject and pair it with daily recall sessions so the planner can build a stronger sequence."
         next_steps = [
             f"Start the next study cycle with {primary['name']} for {primary['hours']}h/week, focused on {primary['mode']} and closing a {primary['gap']} point gap.",
-            (
-                f"Use your second block on {secondary['name']} for {secondary['hours']}h/week and convert every mock mistake into a short revision note."
-                if secondary
-                else "Add one supporting subject and pair it with daily recall sessions so the planner can build a stronger sequence."
-            ),
+            second_step,
             f"Run at least {1 if payload.weekly_hours < 14 else 2} timed test blocks this week and review errors within 24 hours.",
             "End each day with a 15-minute active recall pass from formulas, facts, or error logs instead of passive rereading.",
         ]
@@ -246,9 +198,34 @@ def build_fallback_strategy(payload: PlannerRequest) -> StrategyResponse:
         weekly_plan=weekly_plan[:5],
         risk_alerts=risk_alerts[:5],
         focus_subjects=top_subjects,
+        sources={name: "fallback" for name in STRATEGY_SECTIONS},
     )
 
 
+def build_fallback_strategies(payloads: Sequence[PlannerRequest]) -> list[StrategyResponse]:
+    ranked = rank_subject_batches(payloads)
+    return [build_fallback_strategy(payload, ranked_subjects) for payload, ranked_subjects in zip(payloads, ranked)]
+
+
+class LazyFallback:
+    def __init__(self, payload: PlannerRequest) -> None:
+        self.payload = payload
+        self._strategy: StrategyResponse | None = None
+
+    @property
+    def built(self) -> bool:
+        return self._strategy is not None
+
+    @property
+    def strategy(self) -> StrategyResponse:
+        if self._strategy is None:
+            self._strategy = build_fallback_strategy(self.payload)
+        return self._strategy
+
+    def section(self, name: str) -> str | list[str]:
+        return getattr(self.strategy, name)
+
+
 def _build_user_prompt(payload: PlannerRequest) -> str:
     subject_lines = [
         (
@@ -274,27 +251,251 @@ def _build_user_prompt(payload: PlannerRequest) -> str:
     )
 
 
-def generate_ai_strategy(payload: PlannerRequest) -> StrategyResponse:
-    from dotenv import load_dotenv
-    load_dotenv()
-    
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _openai_model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # ensure a valid model like 4o is used as default
+
+
+_client: Any = None
+_client_ready = False
+_semaphore: asyncio.Semaphore | None = None
+_breaker: CircuitBreaker | None = None
+_retry_budget: RetryBudget | None = None
+_client_lock = threading.Lock()
+_inflight = SingleFlight()
+_upgrades = PendingResults(
+    max_entries=_int_env("STRATEGY_UPGRADE_MAX_ENTRIES", 1024),
+    ttl_seconds=_float_env("STRATEGY_UPGRADE_TTL_SECONDS", 300.0),
+)
+
+strategy_cache_events = registry.gauge(
+    "planner_strategy_cache_events",
+    "Strategy cache and request coalescing counters since startup.",
+    ("event",),
+)
+
+
+def _collect_generation_metrics() -> None:
+    for event, value in get_strategy_cache().stats().items():
+        strategy_cache_events.set(value, event=f"cache_{event}")
+    for event, value in _inflight.stats().items():
+        strategy_cache_events.set(value, event=f"coalescing_{event}")
+    for event, value in _upgrades.stats().items():
+        strategy_upgrade_events.set(value, event=event)
+
+
+strategy_upgrade_events = registry.gauge(
+    "planner_strategy_upgrades",
+    "AI strategies still being generated after a deadline fallback, and upgrade tokens issued and collected.",
+    ("event",),
+)
+strategy_deadline_misses = registry.counter(
+    "planner_strategy_deadline_misses_total",
+    "Strategy requests answered with the fallback plan because the AI call missed its deadline.",
+)
+
+
+registry.add_collector(_collect_generation_metrics)
+
+
+def _create_ai_client() -> Any:
     api_key = os.getenv("OPENAI_API_KEY")
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini") # ensure a valid model like 4o is used as default
+    if not api_key:
+        return None
 
-    if not api_key or OpenAI is None:
-        return build_fallback_strategy(payload)
+    # The SDK takes seconds to import, so it is only loaded once a generation actually needs it.
+    try:
+        from httpx import Limits
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    except ImportError:  # pragma: no cover
+        return None
+
+    max_connections = _int_env("OPENAI_MAX_CONNECTIONS", 64)
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        timeout=_float_env("OPENAI_TIMEOUT_SECONDS", 30.0),
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(
+            limits=Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        ),
+    )
+    # The chat resources are imported on first attribute access, which costs another second or so.
+    client.chat.completions
+    return client
+
+
+def init_ai_client() -> None:
+    global _client, _client_ready, _semaphore, _breaker, _retry_budget
+    _semaphore = asyncio.Semaphore(_int_env("OPENAI_MAX_CONCURRENCY", 32))
+    _breaker = CircuitBreaker.from_env()
+    _retry_budget = RetryBudget.from_env()
+    _client = _create_ai_client()
+    _client_ready = True
+
+
+async def close_ai_client() -> None:
+    global _client, _client_ready
+    client, _client, _client_ready = _client, None, False
+    if client is not None:
+        await client.close()
+
+
+def _get_ai_client() -> Any:
+    if not _client_ready:
+        with _client_lock:
+            if not _client_ready:
+                init_ai_client()
+    return _client
+
+
+def preload_ai_client() -> None:
+    _get_ai_client()
+
+
+async def _ai_client() -> Any:
+    # Building the client imports the SDK, so it never happens on the event loop.
+    if _client_ready:
+        return _client
+    return await asyncio.to_thread(_get_ai_client)
+
+
+def _parse_model_output(raw_output: str) -> dict[str, Any] | None:
+    # Remove any Markdown JSON wrappings that might get attached
+    clean_json_str = raw_output
+    if clean_json_str.startswith("```json"):
+        clean_json_str = clean_json_str[7:]
+        if clean_json_str.endswith("```"):
+            clean_json_str = clean_json_str[:-3]
+    clean_json_str = clean_json_str.strip()
 
-    client = OpenAI(api_key=api_key)
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": _build_user_prompt(payload)}
-            ],
-            temperature=0.7,
-        )
-        raw_output = response.choices[0].message.content.strip()
+        parsed = json.loads(clean_json_str)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _unstructured_strategy(payload: PlannerRequest, model: str, raw_output: str) -> StrategyResponse:
+    return StrategyResponse(
+        mode="ai",
+        model=model,
+        summary=raw_output,
+        next_steps=["Review the generated summary and refine the inputs for more structure."],
+        weekly_plan=["Run the request again after adding fuller subject data."],
+        risk_alerts=["The model returned unstructured text, so the planner used a minimal fallback wrapper."],
+        focus_subjects=[subject.name for subject in payload.subjects[:3]] or ["Add subjects for prioritization."],
+        sources={name: "ai" if name == "summary" else "placeholder" for name in STRATEGY_SECTIONS},
+    )
+
+
+def _section_value(name: str, value: Any) -> str | list[str]:
+    if name == "summary":
+        return "" if value is None else str(value).strip()
+    if not isinstance(value, list):
+        return []
+    return [str(item) for item in value][:5]
+
+
+def _merge_strategy(payload: PlannerRequest, model: str, parsed: dict[str, Any]) -> StrategyResponse:
+    fallback = LazyFallback(payload)
+    sections: dict[str, str | list[str]] = {}
+    sources: dict[str, str] = {}
+
+    for name in STRATEGY_SECTIONS:
+        value = _section_value(name, parsed.get(name))
+        if value:
+            sections[name], sources[name] = value, "ai"
+        else:
+            sections[name], sources[name] = fallback.section(name), "fallback"
+
+    return StrategyResponse(mode="ai", model=model, sources=sources, **sections)
+
+
+def _retryable(exc: Exception) -> bool:
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):
+        return True
+    return isinstance(exc, APIStatusError) and (exc.status_code in (408, 409, 429) or exc.status_code >= 500)
+
+
+@contextmanager
+def _breaker_call() -> Iterator[None]:
+    # Every upstream call goes through the breaker, so an outage short-circuits to the fallback
+    # engine instead of making each request wait for its own failure. A cancelled call, such as
+    # a client closing the page mid-stream, is not an upstream failure and is not recorded.
+    if not _breaker.allow():
+        raise CircuitOpenError("The LLM circuit breaker is open.")
+
+    started = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        _breaker.release()
+        raise
+    except BaseException:
+        _breaker.record(False, time.perf_counter() - started)
+        raise
+    _breaker.record(True, time.perf_counter() - started)
+
+
+async def _create_completion(client: Any, **request: Any) -> Any:
+    with _breaker_call():
+        return await client.chat.completions.create(**request)
+
+
+async def _create_completion_with_retries(client: Any, **request: Any) -> Any:
+    _retry_budget.deposit()
+    max_retries = max(0, int(os.getenv("OPENAI_MAX_RETRIES", 2)))
+    attempt = 0
+    while True:
+        try:
+            async with _semaphore:
+                return await _create_completion(client, **request)
+        except CircuitOpenError:
+            raise
+        except Exception as exc:
+            if attempt >= max_retries or not _retryable(exc) or not _retry_budget.withdraw():
+                raise
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+
+async def _request_ai_strategy(
+    client: Any,
+    payload: PlannerRequest,
+    model: str,
+    cache_key: str,
+) -> StrategyResponse:
+    try:
+        with observe("llm_upstream"):
+            response = await _create_completion_with_retries(
+                client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": _build_user_prompt(payload)}
+                ],
+                temperature=0.7,
+                timeout=_float_env("OPENAI_TIMEOUT_SECONDS", 30.0),
+            )
+        raw_output = (response.choices[0].message.content or "").strip()
+    except CircuitOpenError:
+        raw_output = ""
     except Exception as e:
         # Fallback if OpenAI call fully fails
         print(f"OpenAI API failed: {e}")
@@ -303,33 +504,250 @@ def generate_ai_strategy(payload: PlannerRequest) -> StrategyResponse:
     if not raw_output:
         return build_fallback_strategy(payload)
 
-    try:
-        # Remove any Markdown JSON wrappings that might get attached
-        clean_json_str = raw_output
-        if clean_json_str.startswith("```json"):
-            clean_json_str = clean_json_str[7:]
-            if clean_json_str.endswith("```"):
-                clean_json_str = clean_json_str[:-3]
-        clean_json_str = clean_json_str.strip()
+    with observe("llm_parse"):
+        parsed = _parse_model_output(raw_output)
+    if parsed is None:
+        return _unstructured_strategy(payload, model, raw_output)
 
-        parsed = json.loads(clean_json_str)
-    except json.JSONDecodeError:
-        return StrategyResponse(
-            mode="ai",
-            model=model,
-            summary=raw_output,
-            next_steps=["Review the generated summary and refine the inputs for more structure."],
-            weekly_plan=["Run the request again after adding fuller subject data."],
-            risk_alerts=["The model returned unstructured text, so the planner used a minimal fallback wrapper."],
-            focus_subjects=[subject.name for subject in payload.subjects[:3]] or ["Add subjects for prioritization."],
-        )
+    strategy = _merge_strategy(payload, model, parsed)
+    await get_strategy_cache().set_async(cache_key, strategy)
+    return strategy
 
-    return StrategyResponse(
-        mode="ai",
-        model=model,
-        summary=str(parsed.get("summary", "")).strip() or build_fallback_strategy(payload).summary,
-        next_steps=[str(item) for item in parsed.get("next_steps", [])][:5] or build_fallback_strategy(payload).next_steps,
-        weekly_plan=[str(item) for item in parsed.get("weekly_plan", [])][:5] or build_fallback_strategy(payload).weekly_plan,
-        risk_alerts=[str(item) for item in parsed.get("risk_alerts", [])][:5] or build_fallback_strategy(payload).risk_alerts,
-        focus_subjects=[str(item) for item in parsed.get("focus_subjects", [])][:5] or build_fallback_strategy(payload).focus_subjects,
+
+@timed("generate_ai_strategy")
+async def generate_ai_strategy(payload: PlannerRequest) -> StrategyResponse:
+    client = await _ai_client()
+    model = _openai_model()
+
+    if client is None:
+        return build_fallback_strategy(payload)
+
+    cache_key = strategy_cache_key(payload, model, SYSTEM_PROMPT_VERSION)
+    cached = await get_strategy_cache().get_async(cache_key)
+    if cached is not None:
+        return cached
+
+    return await _inflight.do(
+        cache_key,
+        lambda: _request_ai_strategy(client, payload, model, cache_key),
     )
+
+
+def _strategy_deadline() -> float | None:
+    try:
+        deadline = float(os.getenv("STRATEGY_DEADLINE_SECONDS") or 0)
+    except ValueError:
+        return None
+    return deadline if deadline > 0 else None
+
+
+async def _upgraded_strategy(payload: PlannerRequest) -> StrategyResponse:
+    try:
+        return await generate_ai_strategy(payload)
+    except Exception as exc:
+        print(f"Strategy upgrade failed: {exc}")
+        return build_fallback_strategy(payload)
+
+
+async def generate_strategy_within(
+    payload: PlannerRequest, deadline: float | None = None
+) -> tuple[StrategyResponse, str | None]:
+    # Races the AI call against the deadline. When it loses, the fallback plan goes out right away
+    # and the call keeps running; the returned token collects its result with collect_upgrade.
+    if deadline is None:
+        deadline = _strategy_deadline()
+    if deadline is None:
+        return await generate_ai_strategy(payload), None
+
+    task = asyncio.ensure_future(_upgraded_strategy(payload))
+    done, _ = await asyncio.wait({task}, timeout=deadline)
+    if task in done:
+        return task.result(), None
+
+    strategy_deadline_misses.inc()
+    return build_fallback_strategy(payload), _upgrades.add(task)
+
+
+async def collect_upgrade(token: str, wait: float = 0) -> tuple[bool, StrategyResponse | None]:
+    return await _upgrades.wait(token, wait)
+
+
+async def generate_strategy_batch(
+    payloads: list[PlannerRequest],
+) -> AsyncIterator[tuple[list[int], StrategyResponse | None, str | None]]:
+    model = _openai_model()
+    groups: dict[str, list[int]] = {}
+    unique: dict[str, PlannerRequest] = {}
+    for index, payload in enumerate(payloads):
+        key = strategy_cache_key(payload, model, SYSTEM_PROMPT_VERSION)
+        groups.setdefault(key, []).append(index)
+        unique.setdefault(key, payload)
+
+    if await _ai_client() is None:
+        for key, strategy in zip(unique, build_fallback_strategies(list(unique.values()))):
+            yield groups[key], strategy, None
+        return
+
+    limit = asyncio.Semaphore(_int_env("BATCH_MAX_CONCURRENCY", 16))
+
+    async def run(key: str) -> tuple[str, StrategyResponse | None, str | None]:
+        async with limit:
+            try:
+                return key, await generate_ai_strategy(unique[key]), None
+            except Exception as exc:
+                return key, None, str(exc) or exc.__class__.__name__
+
+    tasks = [asyncio.create_task(run(key)) for key in unique]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, strategy, error = await next_done
+            yield groups[key], strategy, error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _strategy_events(strategy: StrategyResponse) -> list[tuple[str, dict[str, Any]]]:
+    events = [
+        ("section", {"name": name, "value": getattr(strategy, name), "source": strategy.sources.get(name, strategy.mode)})
+        for name in STRATEGY_SECTIONS
+    ]
+    events.append(("done", strategy.model_dump()))
+    return events
+
+
+async def _read_completion_stream(
+    client: Any, payload: PlannerRequest, model: str, deltas: asyncio.Queue[str | None]
+) -> None:
+    # Reads the upstream at its own pace, so a slow SSE reader never holds a concurrency slot or
+    # keeps the upstream connection checked out. Not retried: sections may already have been sent.
+    # The breaker sees the whole read, so mid-stream errors and stalls count against the upstream.
+    try:
+        async with _semaphore:
+            with _breaker_call():
+                stream = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": _build_user_prompt(payload)}
+                    ],
+                    temperature=0.7,
+                    timeout=_float_env("OPENAI_TIMEOUT_SECONDS", 30.0),
+                    stream=True,
+                )
+                async with stream:
+                    async for chunk in stream:
+                        if chunk.choices:
+                            deltas.put_nowait(chunk.choices[0].delta.content or "")
+    finally:
+        deltas.put_nowait(None)
+
+
+def _fallback_section_events(fallback: LazyFallback) -> list[tuple[str, dict[str, Any]]]:
+    return [
+        ("section", {"name": name, "value": fallback.section(name), "source": "fallback"})
+        for name in STRATEGY_SECTIONS
+    ]
+
+
+async def stream_ai_strategy(
+    payload: PlannerRequest, deadline: float | None = None
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    # Past the deadline with no AI section yet, the fallback sections go out first and AI sections
+    # replace them as they arrive on the same stream.
+    if deadline is None:
+        deadline = _strategy_deadline()
+    loop = asyncio.get_running_loop()
+    fallback_at = loop.time() + deadline if deadline is not None else None
+    fallback = LazyFallback(payload)
+
+    client_ready = asyncio.ensure_future(_ai_client())
+    if fallback_at is not None:
+        await asyncio.wait({client_ready}, timeout=deadline)
+        if not client_ready.done():
+            strategy_deadline_misses.inc()
+            fallback_at = None
+            for event in _fallback_section_events(fallback):
+                yield event
+    client = await client_ready
+    model = _openai_model()
+
+    if client is None:
+        if fallback.built:
+            yield "done", fallback.strategy.model_dump()
+            return
+        for event in _strategy_events(fallback.strategy):
+            yield event
+        return
+
+    cache_key = strategy_cache_key(payload, model, SYSTEM_PROMPT_VERSION)
+    cached = await get_strategy_cache().get_async(cache_key)
+    if cached is not None:
+        for event in _strategy_events(cached):
+            yield event
+        return
+
+    parser = StrategySectionParser()
+    sections: dict[str, str | list[str]] = {}
+    sources: dict[str, str] = {}
+    deltas: asyncio.Queue[str | None] = asyncio.Queue()
+    reader = asyncio.create_task(_read_completion_stream(client, payload, model, deltas))
+    try:
+        while True:
+            if fallback_at is None or sections:
+                delta = await deltas.get()
+            else:
+                try:
+                    delta = await asyncio.wait_for(deltas.get(), max(0.0, fallback_at - loop.time()))
+                except asyncio.TimeoutError:
+                    strategy_deadline_misses.inc()
+                    fallback_at = None
+                    for event in _fallback_section_events(fallback):
+                        yield event
+                    continue
+            if delta is None:
+                break
+            for name, value in parser.feed(delta):
+                if name not in STRATEGY_SECTIONS or name in sections:
+                    continue
+                value = _section_value(name, value)
+                if value:
+                    sections[name], sources[name] = value, "ai"
+                    yield "section", {"name": name, "value": value, "source": "ai"}
+        await reader
+    except CircuitOpenError:
+        pass
+    except Exception as e:
+        # Keep whatever sections already arrived and fill the rest from the fallback engine
+        print(f"OpenAI stream failed: {e}")
+    finally:
+        # A client that disconnects closes this generator; the reader then closes the upstream stream.
+        reader.cancel()
+        if reader.done() and not reader.cancelled():
+            reader.exception()
+
+    # Sections sent at the deadline are not sent again.
+    sent_fallback = fallback.built
+    raw_output = parser.text.strip()
+    if not sections:
+        if raw_output and not parser.started:
+            strategy = _unstructured_strategy(payload, model, raw_output)
+        elif sent_fallback:
+            yield "done", fallback.strategy.model_dump()
+            return
+        else:
+            strategy = fallback.strategy
+        for event in _strategy_events(strategy):
+            yield event
+        return
+
+    for name in STRATEGY_SECTIONS:
+        if name not in sections:
+            sections[name], sources[name] = fallback.section(name), "fallback"
+            if not sent_fallback:
+                yield "section", {"name": name, "value": sections[name], "source": "fallback"}
+
+    strategy = StrategyResponse(mode="ai", model=model, sources=sources, **sections)
+    if parser.finished:
+        await get_strategy_cache().set_async(cache_key, strategy)
+    yield "done", strategy.model_dump()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from jinja2 import pass_context
+from starlette.datastructures import URL, Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore[assignment]
+
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson")
+
+
+def accepted_encodings(headers: Headers) -> list[str]:
+    # Server preference order; the client's q-values only decide what is acceptable at all.
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, parameters = part.strip().partition(";")
+        if parameters.strip().replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        accepted.add(coding.strip().lower())
+    preferred = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return [coding for coding in preferred if coding in accepted or "*" in accepted]
+
+
+@dataclass(frozen=True)
+class _Asset:
+    media_type: str
+    digest: str
+    variants: dict[str, bytes]
+
+
+class AssetFiles(StaticFiles):
+    def __init__(self, directory: Path) -> None:
+        super().__init__(directory=directory)
+        self.urls: dict[str, str] = {}
+        self._assets: dict[str, _Asset] = {}
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                self._add(path.relative_to(directory).as_posix(), path.read_bytes())
+
+    def _add(self, name: str, data: bytes) -> None:
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, dot, suffix = name.rpartition(".")
+        fingerprinted = f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+        # Variants are built once at startup and only kept when they are actually smaller.
+        variants = {"identity": data}
+        compressed = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(data, quality=11)
+        for coding, body in compressed.items():
+            if len(body) < len(data):
+                variants[coding] = body
+
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.urls[name] = fingerprinted
+        self._assets[fingerprinted] = _Asset(media_type, digest, variants)
+
+    def fingerprint(self, path: str) -> str:
+        name = path.lstrip("/")
+        return path[: len(path) - len(name)] + self.urls.get(name, name)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self._assets.get(path.replace(os.sep, "/"))
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        headers = Headers(scope=scope)
+        coding = next((coding for coding in accepted_encodings(headers) if coding in asset.variants), "identity")
+        response_headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+            "ETag": f'"{asset.digest}-{coding}"',
+        }
+        if coding != "identity":
+            response_headers["Content-Encoding"] = coding
+
+        if headers.get("if-none-match") == response_headers["ETag"]:
+            return Response(status_code=304, headers=response_headers)
+        return Response(asset.variants[coding], media_type=asset.media_type, headers=response_headers)
+
+    def template_url_for(self, mount_name: str = "static") -> Callable[..., URL]:
+        @pass_context
+        def url_for(context: dict[str, Any], name: str, /, **path_params: Any) -> URL:
+            if name == mount_name and "path" in path_params:
+                path_params["path"] = self.fingerprint(path_params["path"])
+            return context["request"].url_for(name, **path_params)
+
+        return url_for
+
+
+class _Compressor:
+    def __init__(self, coding: str) -> None:
+        if coding == "br":
+            self._brotli = brotli.Compressor(quality=5)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, *, final: bool) -> bytes:
+        # Every chunk is flushed so streamed NDJSON lines reach the client as soon as they are sent.
+        if self._brotli is not None:
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codings = accepted_encodings(Headers(scope=scope))
+        if not codings:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip()
+                if content_type in COMPRESSIBLE_TYPES and "content-encoding" not in headers:
+                    start = message
+                    return
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+
+                compressor = _Compressor(codings[0])
+                headers["Content-Encoding"] = codings[0]
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                body = compressor.compress(body, final=not more_body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            await send({"type": "http.response.body", "body": compressor.compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.cache import TTLCache
+from app.db import create_user, get_user_by_id, get_user_credentials, run_db, update_password_hash
+from app.executors import BoundedExecutor
+from app.metrics import registry, timed
+from app.models import UserResponse
+
+T = TypeVar("T")
+
+HASH_SCHEME = "pbkdf2_sha256"
+LEGACY_ITERATIONS = 120_000
+
+
+def password_iterations() -> int:
+    try:
+        return max(10_000, int(os.getenv("PASSWORD_HASH_ITERATIONS", LEGACY_ITERATIONS)))
+    except ValueError:
+        return LEGACY_ITERATIONS
+
+
+@timed("hash_password")
+def _hash_password(password: str, salt: str, iterations: int = LEGACY_ITERATIONS) -> str:
+    return hashlib.pbkdf2_hmac(
+        "sha256",
+        password.encode("utf-8"),
+        salt.encode("utf-8"),
+        iterations,
+    ).hex()
+
+
+def encode_password_hash(password: str, salt: str, iterations: int | None = None) -> str:
+    iterations = iterations or password_iterations()
+    return f"{HASH_SCHEME}${iterations}${_hash_password(password, salt, iterations)}"
+
+
+def verify_password(password: str, salt: str, stored_hash: str) -> tuple[bool, bool]:
+    # Rows written before the versioned format hold a bare hex digest at the legacy iteration count.
+    if stored_hash.startswith(f"{HASH_SCHEME}$"):
+        _, iterations_text, digest = stored_hash.split("$", 2)
+        iterations = int(iterations_text)
+        versioned = True
+    else:
+        iterations, digest, versioned = LEGACY_ITERATIONS, stored_hash, False
+
+    attempted = _hash_password(password, salt, iterations)
+    valid = hmac.compare_digest(attempted, digest)
+    needs_rehash = valid and (not versioned or iterations != password_iterations())
+    return valid, needs_rehash
+
+
+class HasherBusyError(RuntimeError):
+    pass
+
+
+hash_pending = registry.gauge(
+    "planner_password_hash_pending",
+    "Password hashing jobs queued or running.",
+)
+hash_rejected = registry.counter(
+    "planner_password_hash_rejected_total",
+    "Password hashing jobs rejected because the queue was full.",
+)
+hash_queue_wait = registry.histogram(
+    "planner_password_hash_queue_seconds",
+    "Time password hashing jobs waited for a worker.",
+)
+
+
+class PasswordHasher(BoundedExecutor):
+    def __init__(self, workers: int, max_pending: int) -> None:
+        super().__init__(workers, max_pending, hash_pending, hash_rejected)
+
+    @classmethod
+    def from_env(cls) -> PasswordHasher:
+        return cls(
+            workers=int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))),
+            max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64)),
+        )
+
+    def _create_executor(self) -> ThreadPoolExecutor:
+        # hashlib releases the GIL during PBKDF2, so a thread pool gives real parallelism here.
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def busy_error(self) -> Exception:
+        return HasherBusyError("Too many sign-in attempts are being processed. Please retry shortly.")
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            hash_queue_wait.observe(time.perf_counter() - submitted)
+            return function(*args)
+
+        return await asyncio.wrap_future(self.submit(self._get_executor(), job))
+
+
+password_hasher = PasswordHasher.from_env()
+
+
+user_cache: TTLCache[int, UserResponse] = TTLCache(
+    max_entries=int(os.getenv("USER_CACHE_MAX_ENTRIES", 4096)),
+    ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", 300)),
+)
+
+user_cache_events = registry.gauge(
+    "planner_user_cache_events",
+    "Authenticated-user cache size, and hits, misses and evictions since startup.",
+    ("event",),
+)
+
+
+def _collect_user_cache_metrics() -> None:
+    for event, value in user_cache.stats().items():
+        user_cache_events.set(value, event=event)
+
+
+registry.add_collector(_collect_user_cache_metrics)
+
+
+async def load_user(user_id: int) -> UserResponse | None:
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await run_db(get_user_by_id, user_id)
+        if user is not None:
+            user_cache.set(user.id, user)
+    return user
+
+
+# Unknown emails are checked against a throwaway hash so both login failures cost one full hash.
+_DUMMY_SALT = secrets.token_hex(16)
+
+
+async def register_user(name: str, email: str, password: str) -> UserResponse:
+    salt = secrets.token_hex(16)
+    password_hash = await password_hasher.run(encode_password_hash, password, salt)
+    user = await run_db(create_user, name, email, salt, password_hash)
+    user_cache.set(user.id, user)
+    return user
+
+
+async def authenticate_user(email: str, password: str) -> UserResponse | None:
+    credentials = await run_db(get_user_credentials, email)
+    if credentials is None:
+        dummy_hash = f"{HASH_SCHEME}${password_iterations()}${'0' * 64}"
+        await password_hasher.run(verify_password, password, _DUMMY_SALT, dummy_hash)
+        return None
+
+    user, salt, stored_hash = credentials
+    valid, needs_rehash = await password_hasher.run(verify_password, password, salt, stored_hash)
+    if not valid:
+        return None
+
+    if needs_rehash:
+        password_hash = await password_hasher.run(encode_password_hash, password, salt)
+        await run_db(update_password_hash, user.id, password_hash)
+        user_cache.pop(user.id)
+
+    user_cache.set(user.id, user)
+    return user
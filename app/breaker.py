@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import random
+import time
+from collections import deque
+
+from app.metrics import registry
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+breaker_state = registry.gauge(
+    "planner_llm_breaker_state",
+    "1 for the current state of the upstream LLM circuit breaker, 0 for the others.",
+    ("state",),
+)
+breaker_transitions = registry.counter(
+    "planner_llm_breaker_transitions_total",
+    "Upstream LLM circuit breaker state changes.",
+    ("from_state", "to_state"),
+)
+breaker_rejected = registry.counter(
+    "planner_llm_breaker_rejected_total",
+    "LLM calls short-circuited to the fallback engine while the breaker was open.",
+)
+llm_retries = registry.counter(
+    "planner_llm_retries_total",
+    "Retries of failed LLM calls, and retries skipped because the retry budget was spent.",
+    ("outcome",),
+)
+
+
+class CircuitBreaker:
+    # Closed: calls go through and their outcomes fill a sliding window. Once the window holds
+    # min_calls outcomes and the share of failed or slow calls reaches failure_rate, the breaker
+    # opens and rejects calls for open_seconds. Half-open then lets half_open_calls probes through;
+    # all of them succeeding closes it again, any failure reopens it.
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 15.0,
+        min_calls: int = 10,
+        window_seconds: float = 10.0,
+        open_seconds: float = 15.0,
+        half_open_calls: int = 3,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._export_state()
+
+    @classmethod
+    def from_env(cls) -> CircuitBreaker:
+        return cls(
+            failure_rate=float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5)),
+            slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", 15)),
+            min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", 10)),
+            window_seconds=float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", 10)),
+            open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 15)),
+            half_open_calls=int(os.getenv("LLM_BREAKER_HALF_OPEN_CALLS", 3)),
+        )
+
+    def _export_state(self) -> None:
+        for state in STATES:
+            breaker_state.set(1 if state == self.state else 0, state=state)
+
+    def _transition(self, state: str) -> None:
+        breaker_transitions.inc(from_state=self.state, to_state=state)
+        print(f"LLM circuit breaker {self.state} -> {state}")
+        self.state = state
+        self._outcomes.clear()
+        self._failures = 0
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._export_state()
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                breaker_rejected.inc()
+                return False
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                breaker_rejected.inc()
+                return False
+            self._probes += 1
+        return True
+
+    def release(self) -> None:
+        # For a call that was let through but cancelled before it finished: its outcome says
+        # nothing about the upstream, so only the half-open probe slot is given back.
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, succeeded: bool, duration: float) -> None:
+        failed = not succeeded or duration >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if failed:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            # A call let through before the breaker opened; its outcome is already accounted for.
+            return
+
+        now = time.monotonic()
+        self._outcomes.append((now, failed))
+        self._failures += failed
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._failures -= self._outcomes.popleft()[1]
+        if len(self._outcomes) >= self.min_calls and self._failures / len(self._outcomes) >= self.failure_rate:
+            self._transition(OPEN)
+
+
+class RetryBudget:
+    # Retries may add at most `ratio` extra calls on top of the requests seen in the last
+    # window_seconds, plus min_retries so a quiet service can still retry a one-off failure.
+    # This keeps retries from multiplying load on an upstream that is already failing.
+    def __init__(self, ratio: float = 0.1, min_retries: int = 5, window_seconds: float = 10.0) -> None:
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    @classmethod
+    def from_env(cls) -> RetryBudget:
+        return cls(
+            ratio=float(os.getenv("LLM_RETRY_BUDGET_RATIO", 0.1)),
+            min_retries=int(os.getenv("LLM_RETRY_BUDGET_MIN", 5)),
+            window_seconds=float(os.getenv("LLM_RETRY_BUDGET_WINDOW_SECONDS", 10)),
+        )
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window_seconds:
+                events.popleft()
+
+    def deposit(self) -> None:
+        now = time.monotonic()
+        self._trim(now)
+        self._requests.append(now)
+
+    def withdraw(self) -> bool:
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            llm_retries.inc(outcome="budget_exhausted")
+            return False
+        self._retries.append(now)
+        llm_retries.inc(outcome="attempted")
+        return True
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    # Full jitter: concurrent retries spread out instead of hitting the upstream in lockstep.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
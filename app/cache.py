@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Generic, TypeVar
+
+from app.db import DATABASE_PATH
+from app.models import PlannerRequest, StrategyResponse
+
+
+CACHE_DATABASE_PATH = DATABASE_PATH.with_name("strategy_cache.db")
+PDF_CACHE_DIR = DATABASE_PATH.with_name("pdf_cache")
+
+T = TypeVar("T")
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+def _normalize_text(value: str) -> str:
+    return " ".join(value.split())
+
+
+def normalize_payload(payload: PlannerRequest) -> dict[str, Any]:
+    data = payload.model_dump()
+    for key in ("exam_name", "target_date", "study_style", "constraints"):
+        data[key] = _normalize_text(data[key])
+    for subject in data["subjects"]:
+        subject["name"] = _normalize_text(subject["name"])
+    return data
+
+
+def strategy_cache_key(payload: PlannerRequest, model: str, prompt_version: str) -> str:
+    canonical = json.dumps(
+        {"payload": normalize_payload(payload), "model": model, "prompt": prompt_version},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TTLCache(Generic[K, V]):
+    # A thread-safe LRU whose entries also expire ttl_seconds after they are set. Expired entries
+    # are dropped when they are looked up or reach the old end; both count as evictions.
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _prune(self, now: float) -> None:
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            self.evictions += 1
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        with self._lock:
+            now = self.clock()
+            self._entries[key] = (now + self.ttl_seconds if expires_at is None else expires_at, value)
+            self._entries.move_to_end(key)
+            self._prune(now)
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def values(self) -> list[V]:
+        with self._lock:
+            self._prune(self.clock())
+            return [value for _, value in self._entries.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class StrategyCache:
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 6 * 60 * 60,
+        database_path: Path | None = None,
+        max_persistent_entries: int = 10_000,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.database_path = database_path
+        self.max_persistent_entries = max_persistent_entries
+        # Wall-clock expiry, since persisted entries carry their expires_at across restarts.
+        self._memory: TTLCache[str, StrategyResponse] = TTLCache(max_entries, ttl_seconds, clock=time.time)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._connection_lock = threading.Lock()
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> StrategyCache:
+        persist = os.getenv("STRATEGY_CACHE_PERSIST", "").lower() in {"1", "true", "yes"}
+        return cls(
+            max_entries=int(os.getenv("STRATEGY_CACHE_MAX_ENTRIES", 512)),
+            ttl_seconds=float(os.getenv("STRATEGY_CACHE_TTL_SECONDS", 6 * 60 * 60)),
+            database_path=CACHE_DATABASE_PATH if persist else None,
+            max_persistent_entries=int(os.getenv("STRATEGY_CACHE_DB_MAX_ENTRIES", 10_000)),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection for the life of the cache; callers hold _connection_lock while using it.
+        if self._connection is None:
+            connection = sqlite3.connect(self.database_path, check_same_thread=False)
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS strategy_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    strategy_json TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_strategy_cache_stored_at ON strategy_cache (stored_at)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _get_persistent(self, key: str) -> StrategyResponse | None:
+        with self._connection_lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT strategy_json, expires_at FROM strategy_cache WHERE cache_key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        strategy = StrategyResponse.model_validate_json(row[0])
+        self._memory.set(key, strategy, expires_at=row[1])
+        with self._lock:
+            self.persistent_hits += 1
+        return strategy
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def get(self, key: str) -> StrategyResponse | None:
+        strategy = self._memory.get(key)
+        if strategy is None and self.database_path is not None:
+            strategy = self._get_persistent(key)
+        if strategy is None:
+            self._count_miss()
+        return strategy
+
+    async def get_async(self, key: str) -> StrategyResponse | None:
+        # The memory tier is answered inline; only the SQLite tier goes to a worker thread.
+        strategy = self._memory.get(key)
+        if strategy is None and self.database_path is not None:
+            strategy = await asyncio.to_thread(self._get_persistent, key)
+        if strategy is None:
+            self._count_miss()
+        return strategy
+
+    def _persist(self, key: str, strategy: StrategyResponse, expires_at: float, now: float) -> None:
+        with self._connection_lock, self._connect() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO strategy_cache (cache_key, strategy_json, expires_at, stored_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, strategy.model_dump_json(), expires_at, now),
+            )
+            connection.execute("DELETE FROM strategy_cache WHERE expires_at <= ?", (now,))
+            connection.execute(
+                """
+                DELETE FROM strategy_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM strategy_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_persistent_entries,),
+            )
+
+    def set(self, key: str, strategy: StrategyResponse) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._memory.set(key, strategy, expires_at=expires_at)
+        if self.database_path is not None:
+            self._persist(key, strategy, expires_at, now)
+
+    async def set_async(self, key: str, strategy: StrategyResponse) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._memory.set(key, strategy, expires_at=expires_at)
+        if self.database_path is not None:
+            await asyncio.to_thread(self._persist, key, strategy, expires_at, now)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.database_path is not None:
+            with self._connection_lock, self._connect() as connection:
+                connection.execute("DELETE FROM strategy_cache")
+
+    def close(self) -> None:
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> dict[str, int]:
+        memory = self._memory.stats()
+        with self._lock:
+            return {
+                "entries": memory["entries"],
+                "memory_hits": memory["hits"],
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "evictions": memory["evictions"],
+            }
+
+
+_strategy_cache: StrategyCache | None = None
+
+
+def get_strategy_cache() -> StrategyCache:
+    global _strategy_cache
+    if _strategy_cache is None:
+        _strategy_cache = StrategyCache.from_env()
+    return _strategy_cache
+
+
+class PdfCache:
+    def __init__(self, directory: Path, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._files: OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> PdfCache:
+        return cls(
+            directory=Path(os.getenv("PDF_CACHE_DIR", PDF_CACHE_DIR)),
+            max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+        )
+
+    def _index(self) -> OrderedDict[str, int]:
+        # Rebuilt from the directory on first use so files rendered before a restart are still served,
+        # oldest first so they are the first to be evicted.
+        if self._files is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = sorted(
+                (entry.stat().st_mtime, entry.stem, entry.stat().st_size)
+                for entry in self.directory.glob("*.pdf")
+            )
+            self._files = OrderedDict((name, size) for _, name, size in files)
+            self._total_bytes = sum(self._files.values())
+        return self._files
+
+    def open(self, key: str) -> BinaryIO | None:
+        # Opening under the lock means eviction cannot remove the file between the lookup and the
+        # open; an evicted file that is already open stays readable until the handle is closed.
+        with self._lock:
+            files = self._index()
+            if key in files:
+                try:
+                    handle = (self.directory / f"{key}.pdf").open("rb")
+                except FileNotFoundError:
+                    self._total_bytes -= files.pop(key)
+                else:
+                    files.move_to_end(key)
+                    self.hits += 1
+                    return handle
+            self.misses += 1
+            return None
+
+    def get(self, key: str) -> bytes | None:
+        handle = self.open(key)
+        if handle is None:
+            return None
+        with handle:
+            return handle.read()
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            files = self._index()
+            path = self.directory / f"{key}.pdf"
+            temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+            temporary.write_bytes(data)
+            temporary.replace(path)
+
+            self._total_bytes += len(data) - files.pop(key, 0)
+            files[key] = len(data)
+            while self._total_bytes > self.max_bytes:
+                evicted, size = files.popitem(last=False)
+                (self.directory / f"{evicted}.pdf").unlink(missing_ok=True)
+                self._total_bytes -= size
+                self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._files or ()),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_pdf_cache: PdfCache | None = None
+
+
+def get_pdf_cache() -> PdfCache:
+    global _pdf_cache
+    if _pdf_cache is None:
+        _pdf_cache = PdfCache.from_env()
+    return _pdf_cache
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, call: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(factory())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        # Shielding keeps one caller's cancellation from cancelling the shared call for everyone else.
+        return await asyncio.shield(call)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class PendingResults:
+    # Hands out unguessable tokens for work that outlives the request that started it, so a later
+    # request can pick up the result. Entries expire after ttl_seconds whether or not anyone asked.
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300) -> None:
+        self._entries: TTLCache[str, asyncio.Future[Any]] = TTLCache(max_entries, ttl_seconds)
+        self.added = 0
+        self.collected = 0
+
+    def add(self, future: asyncio.Future[Any]) -> str:
+        token = secrets.token_urlsafe(16)
+        self._entries.set(token, future)
+        self.added += 1
+        return token
+
+    async def wait(self, token: str, timeout: float) -> tuple[bool, Any]:
+        # Returns (done, result); raises KeyError for unknown or expired tokens.
+        future = self._entries.get(token)
+        if future is None:
+            raise KeyError(token)
+        if timeout > 0 and not future.done():
+            await asyncio.wait({future}, timeout=timeout)
+        if not future.done():
+            return False, None
+        self.collected += 1
+        return True, future.result()
+
+    def stats(self) -> dict[str, int]:
+        futures = self._entries.values()
+        pending = sum(1 for future in futures if not future.done())
+        return {
+            "pending": pending,
+            "ready": len(futures) - pending,
+            "added": self.added,
+            "collected": self.collected,
+            "expired": self._entries.evictions,
+        }
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+# Stored documents start with a version byte that selects the preset dictionary used to compress them.
+# A dictionary can never change once rows have been written with it; add a new version instead.
+CODEC_VERSION = 1
+
+_DICTIONARIES = {
+    1: (
+        '{"exam_name":"","target_date":"","weekly_hours":,"target_score":,"confidence_level":,"stress_level":,'
+        '"study_style":"Balanced","Concept-first","Practice-heavy","constraints":"","subjects":[{"name":"",'
+        '"priority":,"current_level":,"target_level":,"syllabus_coverage":,"mock_score":}]}'
+        '{"mode":"fallback","mode":"ai","model":"heuristic-engine-v2","model":"gpt-4o-mini","summary":"",'
+        '"next_steps":["","weekly_plan":["","risk_alerts":["","focus_subjects":["","sources":{"summary":"ai",'
+        '"next_steps":"ai","weekly_plan":"ai","risk_alerts":"fallback","focus_subjects":"fallback"}}'
+        " is currently in the foundation phase build-up phase acceleration phase final revision phase with days left."
+        " The fallback strategy estimates readiness at % against a target of %. Use weekly hours to push first"
+        " while keeping stress at % under control. Start the next study cycle with h/week, focused on concept rebuild"
+        " timed drilling mixed revision and closing a point gap. Use your second block on and convert every mock"
+        " mistake into a short revision note. Run at least timed test blocks this week and review errors within 24"
+        " hours. End each day with a 15-minute active recall pass from formulas, facts, or error logs instead of"
+        " passive rereading. Deep work block: spend h/week on concept completion and targeted chapter repair, led by"
+        " Mock and analysis block: spend h/week on timed solving, post-test diagnosis, and pattern tracking."
+        " Revision block: spend h/week on flash review, spaced repetition, and previously missed questions."
+        " Week 1: Week 2: Week 3: Week 4: finish one major block in stabilize with and close the week with one mock"
+        " plus a full review session. Your current performance indicators are significantly below the target score."
+        " Favor practice and analysis over collecting more content. Stress is high. Plan around this constraint: "
+    ).encode("utf-8"),
+}
+
+
+def encode_document(document: dict[str, Any]) -> bytes:
+    raw = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    compressor = zlib.compressobj(level=6, wbits=-15, zdict=_DICTIONARIES[CODEC_VERSION])
+    return bytes([CODEC_VERSION]) + compressor.compress(raw) + compressor.flush()
+
+
+def decode_document_bytes(stored: bytes | str) -> bytes:
+    # Rows written before the codec existed hold plain JSON text.
+    if isinstance(stored, str):
+        return stored.encode("utf-8")
+
+    version = stored[0]
+    if version not in _DICTIONARIES:
+        raise ValueError(f"Unknown saved plan codec version: {version}")
+    decompressor = zlib.decompressobj(wbits=-15, zdict=_DICTIONARIES[version])
+    return decompressor.decompress(stored[1:]) + decompressor.flush()
+
+
+def decode_document(stored: bytes | str) -> dict[str, Any]:
+    return json.loads(decode_document_bytes(stored))
@@ -1,24 +1,127 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import os
-import secrets
+import queue
 import sqlite3
+import threading
+from contextlib import AbstractContextManager, contextmanager
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
 
+from app.codec import decode_document, decode_document_bytes, encode_document
+from app.metrics import observe, registry
 from app.models import PlannerRequest, SavePlanRequest, SavedPlanDetail, SavedPlanSummary, StrategyResponse, UserResponse
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATABASE_PATH = BASE_DIR / "planner.db"
 
+T = TypeVar("T")
 
-def get_connection() -> sqlite3.Connection:
-    connection = sqlite3.connect(DATABASE_PATH)
-    connection.row_factory = sqlite3.Row
-    return connection
+MAX_PLAN_ID = 2**63 - 1
+
+
+class ConnectionPool:
+    def __init__(self, path: Path, size: int = 8) -> None:
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self) -> sqlite3.Connection:
+        # Connections move between worker threads, but only one thread holds a connection at a time.
+        connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256, timeout=5.0)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA cache_size = -8000")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("PRAGMA busy_timeout = 5000")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._open()
+                with self._lock:
+                    self._opened += 1
+
+            try:
+                with connection:
+                    yield connection
+            finally:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"size": self.size, "opened": self._opened, "idle": self._idle.qsize()}
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None or _pool.path != DATABASE_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.path != DATABASE_PATH:
+                if _pool is not None:
+                    _pool.close()
+                _pool = ConnectionPool(DATABASE_PATH, int(os.getenv("DB_POOL_SIZE", 8)))
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+db_pool_connections = registry.gauge(
+    "planner_db_pool_connections",
+    "SQLite connection pool size, opened and idle connections.",
+    ("state",),
+)
+
+
+def _collect_pool_metrics() -> None:
+    if _pool is not None:
+        for state, value in _pool.stats().items():
+            db_pool_connections.set(value, state=state)
+
+
+registry.add_collector(_collect_pool_metrics)
+
+
+def get_connection() -> AbstractContextManager[sqlite3.Connection]:
+    return get_pool().connection()
+
+
+async def run_db(function: Callable[..., T], *args: Any) -> T:
+    return await asyncio.to_thread(function, *args)
 
 
 def initialize_database() -> None:
@@ -43,37 +146,78 @@ def initialize_database() -> None:
                 payload_json TEXT NOT NULL,
                 strategy_json TEXT NOT NULL,
                 created_at TEXT NOT NULL,
+                summary TEXT NOT NULL DEFAULT '',
                 FOREIGN KEY(user_id) REFERENCES users(id)
             );
             """
         )
+        _migrate(connection)
 
 
-def _timestamp() -> str:
-    return datetime.now(UTC).isoformat(timespec="seconds")
+def _migrate(connection: sqlite3.Connection) -> None:
+    # PRAGMA user_version records which of these steps an existing planner.db has already run.
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+
+    if version < 1:
+        columns = {row["name"] for row in connection.execute("PRAGMA table_info(saved_plans)")}
+        if "summary" not in columns:
+            connection.execute("ALTER TABLE saved_plans ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+        connection.execute(
+            "UPDATE saved_plans SET summary = COALESCE(json_extract(strategy_json, '$.summary'), '') WHERE summary = ''"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_saved_plans_user_id_id ON saved_plans (user_id, id DESC)")
+        connection.execute("PRAGMA user_version = 1")
 
+    if version < 2:
+        # Re-encode plans saved as plain JSON text with the compact codec; the column affinity is
+        # TEXT but SQLite keeps BLOB values as they are.
+        rows = connection.execute(
+            "SELECT id, payload_json, strategy_json FROM saved_plans WHERE typeof(payload_json) = 'text' OR typeof(strategy_json) = 'text'"
+        ).fetchall()
+        connection.executemany(
+            "UPDATE saved_plans SET payload_json = ?, strategy_json = ? WHERE id = ?",
+            [
+                (
+                    encode_document(decode_document(row["payload_json"])),
+                    encode_document(decode_document(row["strategy_json"])),
+                    row["id"],
+                )
+                for row in rows
+            ],
+        )
+        connection.execute("PRAGMA user_version = 2")
+
+    if version < 3:
+        # Plan details are served straight from the stored documents, so rows saved before a model
+        # gained a field (such as StrategyResponse.sources) are rewritten with its default filled in.
+        rows = connection.execute("SELECT id, payload_json, strategy_json FROM saved_plans").fetchall()
+        connection.executemany(
+            "UPDATE saved_plans SET payload_json = ?, strategy_json = ? WHERE id = ?",
+            [
+                (
+                    encode_document(PlannerRequest.model_validate_json(decode_document_bytes(row["payload_json"])).model_dump()),
+                    encode_document(StrategyResponse.model_validate_json(decode_document_bytes(row["strategy_json"])).model_dump()),
+                    row["id"],
+                )
+                for row in rows
+            ],
+        )
+        connection.execute("PRAGMA user_version = 3")
 
-def _hash_password(password: str, salt: str) -> str:
-    return hashlib.pbkdf2_hmac(
-        "sha256",
-        password.encode("utf-8"),
-        salt.encode("utf-8"),
-        120_000,
-    ).hex()
 
+def _timestamp() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
 
-def create_user(name: str, email: str, password: str) -> UserResponse:
-    salt = secrets.token_hex(16)
-    password_hash = _hash_password(password, salt)
 
+def create_user(name: str, email: str, password_salt: str, password_hash: str) -> UserResponse:
     try:
-        with get_connection() as connection:
+        with observe("db.create_user"), get_connection() as connection:
             cursor = connection.execute(
                 """
                 INSERT INTO users (name, email, password_salt, password_hash, created_at)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (name, email.lower(), salt, password_hash, _timestamp()),
+                (name, email.lower(), password_salt, password_hash, _timestamp()),
             )
             user_id = cursor.lastrowid
     except sqlite3.IntegrityError as exc:
@@ -82,8 +226,8 @@ def create_user(name: str, email: str, password: str) -> UserResponse:
     return UserResponse(id=user_id, name=name, email=email.lower())
 
 
-def authenticate_user(email: str, password: str) -> UserResponse | None:
-    with get_connection() as connection:
+def get_user_credentials(email: str) -> tuple[UserResponse, str, str] | None:
+    with observe("db.get_user_credentials"), get_connection() as connection:
         row = connection.execute(
             "SELECT id, name, email, password_salt, password_hash FROM users WHERE email = ?",
             (email.lower(),),
@@ -92,15 +236,17 @@ def authenticate_user(email: str, password: str) -> UserResponse | None:
     if row is None:
         return None
 
-    attempted_hash = _hash_password(password, row["password_salt"])
-    if attempted_hash != row["password_hash"]:
-        return None
+    user = UserResponse(id=row["id"], name=row["name"], email=row["email"])
+    return user, row["password_salt"], row["password_hash"]
 
-    return UserResponse(id=row["id"], name=row["name"], email=row["email"])
+
+def update_password_hash(user_id: int, password_hash: str) -> None:
+    with observe("db.update_password_hash"), get_connection() as connection:
+        connection.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id))
 
 
 def get_user_by_id(user_id: int) -> UserResponse | None:
-    with get_connection() as connection:
+    with observe("db.get_user_by_id"), get_connection() as connection:
         row = connection.execute(
             "SELECT id, name, email FROM users WHERE id = ?",
             (user_id,),
@@ -113,17 +259,17 @@ def get_user_by_id(user_id: int) -> UserResponse | None:
 
 
 def save_plan(user_id: int, request: SavePlanRequest) -> SavedPlanSummary:
-    payload_json = request.payload.model_dump_json()
-    strategy_json = request.strategy.model_dump_json()
+    payload_json = encode_document(request.payload.model_dump())
+    strategy_json = encode_document(request.strategy.model_dump())
     created_at = _timestamp()
 
-    with get_connection() as connection:
+    with observe("db.save_plan"), get_connection() as connection:
         cursor = connection.execute(
             """
             INSERT INTO saved_plans (
-                user_id, title, exam_name, target_date, payload_json, strategy_json, created_at
+                user_id, title, exam_name, target_date, payload_json, strategy_json, created_at, summary
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 user_id,
@@ -133,6 +279,7 @@ def save_plan(user_id: int, request: SavePlanRequest) -> SavedPlanSummary:
                 payload_json,
                 strategy_json,
                 created_at,
+                request.strategy.summary,
             ),
         )
         plan_id = cursor.lastrowid
@@ -147,36 +294,102 @@ def save_plan(user_id: int, request: SavePlanRequest) -> SavedPlanSummary:
     )
 
 
-def list_saved_plans(user_id: int) -> list[SavedPlanSummary]:
-    with get_connection() as connection:
+def list_saved_plans(user_id: int, limit: int = 50, before: int | None = None) -> tuple[list[dict[str, Any]], int | None]:
+    # Keyset pagination: walk the (user_id, id DESC) index from the cursor instead of using OFFSET.
+    with observe("db.list_saved_plans"), get_connection() as connection:
         rows = connection.execute(
             """
-            SELECT id, title, exam_name, target_date, strategy_json, created_at
+            SELECT id, title, exam_name, target_date, created_at, summary
             FROM saved_plans
-            WHERE user_id = ?
+            WHERE user_id = ? AND id < ?
             ORDER BY id DESC
+            LIMIT ?
             """,
-            (user_id,),
+            (user_id, before if before is not None else MAX_PLAN_ID, limit + 1),
         ).fetchall()
 
-    plans: list[SavedPlanSummary] = []
-    for row in rows:
-        strategy = json.loads(row["strategy_json"])
-        plans.append(
-            SavedPlanSummary(
-                id=row["id"],
-                title=row["title"],
-                exam_name=row["exam_name"],
-                target_date=row["target_date"],
-                created_at=row["created_at"],
-                summary=str(strategy.get("summary", "")),
-            )
+    # Every column was validated on the way in, so rows go out as plain dicts shaped like
+    # SavedPlanSummary instead of being validated into models again.
+    plans = [dict(row) for row in rows[:limit]]
+    next_cursor = plans[-1]["id"] if len(rows) > limit else None
+    return plans, next_cursor
+
+
+def _plan_fingerprint(row: sqlite3.Row) -> str:
+    # Ids are reused when planner.db is reset or restored, so anything keyed on a saved plan outside
+    # the database (rendered PDFs, ETags) also needs the owner and the stored content.
+    digest = hashlib.sha256()
+    for part in (str(row["user_id"]), row["created_at"], row["title"], row["payload_json"], row["strategy_json"]):
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def get_saved_plan_header(user_id: int, plan_id: int) -> tuple[str, str] | None:
+    with observe("db.get_saved_plan_header"), get_connection() as connection:
+        row = connection.execute(
+            """
+            SELECT user_id, title, created_at, payload_json, strategy_json
+            FROM saved_plans
+            WHERE user_id = ? AND id = ?
+            """,
+            (user_id, plan_id),
+        ).fetchone()
+
+    return (row["title"], _plan_fingerprint(row)) if row is not None else None
+
+
+def list_saved_plan_headers(user_id: int, plan_ids: list[int] | None, limit: int) -> list[tuple[int, str, str]]:
+    columns = "id, user_id, title, created_at, payload_json, strategy_json"
+    with observe("db.list_saved_plan_headers"), get_connection() as connection:
+        if plan_ids is None:
+            rows = connection.execute(
+                f"SELECT {columns} FROM saved_plans WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, limit),
+            ).fetchall()
+        else:
+            placeholders = ", ".join("?" for _ in plan_ids)
+            rows = connection.execute(
+                f"SELECT {columns} FROM saved_plans WHERE user_id = ? AND id IN ({placeholders}) ORDER BY id DESC LIMIT ?",
+                (user_id, *plan_ids, limit),
+            ).fetchall()
+
+    return [(row["id"], row["title"], _plan_fingerprint(row)) for row in rows]
+
+
+def get_saved_plan_json(user_id: int, plan_id: int) -> bytes | None:
+    with observe("db.get_saved_plan_json"), get_connection() as connection:
+        row = connection.execute(
+            """
+            SELECT id, title, payload_json, strategy_json, created_at
+            FROM saved_plans
+            WHERE user_id = ? AND id = ?
+            """,
+            (user_id, plan_id),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    # The stored documents are the model_dump of models validated when the plan was saved, so they
+    # are spliced into the SavedPlanDetail body without being parsed.
+    head = json.dumps(
+        {"id": row["id"], "title": row["title"], "created_at": row["created_at"]}, ensure_ascii=False, separators=(",", ":")
+    )
+    return b"".join(
+        (
+            head[:-1].encode("utf-8"),
+            b',"payload":',
+            decode_document_bytes(row["payload_json"]),
+            b',"strategy":',
+            decode_document_bytes(row["strategy_json"]),
+            b"}",
         )
-    return plans
+    )
 
 
 def get_saved_plan(user_id: int, plan_id: int) -> SavedPlanDetail | None:
-    with get_connection() as connection:
+    with observe("db.get_saved_plan"), get_connection() as connection:
         row = connection.execute(
             """
             SELECT id, title, payload_json, strategy_json, created_at
@@ -189,8 +402,8 @@ def get_saved_plan(user_id: int, plan_id: int) -> SavedPlanDetail | None:
     if row is None:
         return None
 
-    payload = PlannerRequest.model_validate_json(row["payload_json"])
-    strategy = StrategyResponse.model_validate_json(row["strategy_json"])
+    payload = PlannerRequest.model_validate_json(decode_document_bytes(row["payload_json"]))
+    strategy = StrategyResponse.model_validate_json(decode_document_bytes(row["strategy_json"]))
     return SavedPlanDetail(
         id=row["id"],
         title=row["title"],
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, TypeVar
+
+from app.metrics import Counter, Gauge
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    # Admission control in front of a worker pool: at most max_pending jobs are queued or running,
+    # and the rest are rejected straight away instead of piling up behind the workers.
+    def __init__(self, workers: int, max_pending: int, pending_gauge: Gauge, rejected_counter: Counter) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pending_gauge = pending_gauge
+        self._rejected_counter = rejected_counter
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    def _create_executor(self) -> Executor:
+        raise NotImplementedError
+
+    def busy_error(self) -> Exception:
+        raise NotImplementedError
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _release(self, _: Future[Any] | None) -> None:
+        with self._lock:
+            self.pending -= 1
+            self._pending_gauge.set(self.pending)
+
+    def submit(self, executor: Executor, function: Callable[..., T], *args: Any) -> Future[T]:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self._rejected_counter.inc()
+                raise self.busy_error()
+            self.pending += 1
+            self._pending_gauge.set(self.pending)
+
+        try:
+            future = executor.submit(function, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # The slot is released when the worker finishes, not when a caller gives up waiting, so
+        # abandoned jobs still count against the queue while they occupy a worker.
+        future.add_done_callback(self._release)
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,34 +1,113 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Iterator
 
-from fastapi import FastAPI, HTTPException, Request, Response, status
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from pydantic import ValidationError
 from starlette.middleware.sessions import SessionMiddleware
 
-from app.ai import generate_ai_strategy
-from app.db import create_user, get_saved_plan, get_user_by_id, initialize_database, list_saved_plans, save_plan, authenticate_user
+try:
+    from dotenv import load_dotenv
+except ImportError:  # pragma: no cover
+    pass
+else:
+    # Settings here and in the app modules are read at import time, so .env is loaded before them.
+    load_dotenv()
+
+from app.ai import (
+    close_ai_client,
+    collect_upgrade,
+    generate_strategy_batch,
+    generate_strategy_within,
+    preload_ai_client,
+    stream_ai_strategy,
+)
+from app.assets import AssetFiles, CompressionMiddleware
+from app.auth import HasherBusyError, authenticate_user, load_user, password_hasher, register_user
+from app.cache import SingleFlight, get_pdf_cache, get_strategy_cache
+from app.db import (
+    close_pool,
+    get_saved_plan,
+    get_saved_plan_json,
+    get_saved_plan_header,
+    initialize_database,
+    list_saved_plan_headers,
+    list_saved_plans,
+    run_db,
+    save_plan,
+)
+from app.metrics import MetricsMiddleware, registry
 from app.models import (
     AuthLoginRequest,
     AuthRegisterRequest,
     AuthStateResponse,
+    PlanExportRequest,
     PlannerRequest,
     SavePlanRequest,
     SavedPlanDetail,
     SavedPlanSummary,
+    ScheduleDay,
     StrategyResponse,
     UserResponse,
 )
-from app.pdf import build_plan_pdf
+from app.pdf import RENDERER_VERSION
+from app.render import (
+    RenderBusyError,
+    RenderTimeoutError,
+    render_plan_pdf,
+    render_plans_pdf,
+    render_service,
+    stream_zip,
+)
+from app.responses import FastJSONResponse, RawJSONResponse, dumps
+from app.schedule import StudySchedule
 
 
 BASE_DIR = Path(__file__).resolve().parent
+MAX_SUBJECTS = 12
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 500))
+MAX_EXPORT_PLANS = int(os.getenv("MAX_EXPORT_PLANS", 200))
+MAX_SCHEDULE_WEEKS = int(os.getenv("MAX_SCHEDULE_WEEKS", 52))
+MAX_STRATEGY_DEADLINE = 60.0
+MAX_UPGRADE_WAIT = 25.0
+
+
+async def _warm_up() -> None:
+    # Runs once the app is already serving, so a cold start answers /health without waiting for the
+    # OpenAI SDK or the PDF workers; anything not warm yet is loaded on first use instead.
+    try:
+        render_service.start()
+        await asyncio.to_thread(preload_ai_client)
+    except Exception as exc:
+        print(f"Startup warm-up failed: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_db(initialize_database)
+    warm_up = None
+    if os.getenv("STARTUP_WARMUP", "1").lower() not in {"0", "false", "no"}:
+        warm_up = asyncio.create_task(_warm_up())
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    await close_ai_client()
+    password_hasher.shutdown()
+    render_service.shutdown()
+    close_pool()
+    get_strategy_cache().close()
+
 
 app = FastAPI(
     title="AI Exam Preparation Strategy Planner",
     version="2.0.0",
     description="A Python-based AI planner for exam strategy, saved plans, and PDF exports.",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -37,18 +116,36 @@ app.add_middleware(
     same_site="lax",
     https_only=os.getenv("APP_ENV") == "production",
 )
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024)))
+app.add_middleware(MetricsMiddleware)
 
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+static_assets = AssetFiles(BASE_DIR / "static")
+app.mount("/static", static_assets, name="static")
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
-initialize_database()
+templates.env.globals["url_for"] = static_assets.template_url_for()
+
+pdf_renders = SingleFlight()
+pdf_cache_events = registry.gauge(
+    "planner_pdf_cache_events",
+    "Rendered saved-plan PDF cache size, hits, misses and evictions since startup.",
+    ("event",),
+)
 
 
-def require_user(request: Request) -> UserResponse:
+def _collect_pdf_cache_metrics() -> None:
+    for event, value in get_pdf_cache().stats().items():
+        pdf_cache_events.set(value, event=event)
+
+
+registry.add_collector(_collect_pdf_cache_metrics)
+
+
+async def require_user(request: Request) -> UserResponse:
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Please log in first.")
 
-    user = get_user_by_id(int(user_id))
+    user = await load_user(int(user_id))
     if user is None:
         request.session.clear()
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired. Please log in again.")
@@ -59,14 +156,14 @@ def require_user(request: Request) -> UserResponse:
 @app.get("/", include_in_schema=False)
 async def root(request: Request) -> RedirectResponse:
     user_id = request.session.get("user_id")
-    destination = "/planner" if user_id and get_user_by_id(int(user_id)) else "/login"
+    destination = "/planner" if user_id and await load_user(int(user_id)) else "/login"
     return RedirectResponse(url=destination, status_code=status.HTTP_303_SEE_OTHER)
 
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request) -> HTMLResponse:
     user_id = request.session.get("user_id")
-    if user_id and get_user_by_id(int(user_id)):
+    if user_id and await load_user(int(user_id)):
         return RedirectResponse(url="/planner", status_code=status.HTTP_303_SEE_OTHER)
 
     return templates.TemplateResponse(
@@ -81,7 +178,7 @@ async def login_page(request: Request) -> HTMLResponse:
 @app.get("/planner", response_class=HTMLResponse)
 async def planner_page(request: Request) -> HTMLResponse:
     user_id = request.session.get("user_id")
-    user = get_user_by_id(int(user_id)) if user_id else None
+    user = await load_user(int(user_id)) if user_id else None
     if user is None:
         request.session.clear()
         return RedirectResponse(url="/login", status_code=status.HTTP_303_SEE_OTHER)
@@ -102,13 +199,18 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/auth/me", response_model=AuthStateResponse)
 async def auth_me(request: Request) -> AuthStateResponse:
     user_id = request.session.get("user_id")
     if not user_id:
         return AuthStateResponse(authenticated=False)
 
-    user = get_user_by_id(int(user_id))
+    user = await load_user(int(user_id))
     if user is None:
         request.session.clear()
         return AuthStateResponse(authenticated=False)
@@ -116,12 +218,22 @@ async def auth_me(request: Request) -> AuthStateResponse:
     return AuthStateResponse(authenticated=True, user=user)
 
 
+def _busy_error(exc: HasherBusyError | RenderBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(exc),
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.post("/api/auth/register", response_model=AuthStateResponse)
 async def register(request: Request, payload: AuthRegisterRequest) -> AuthStateResponse:
     try:
-        user = create_user(payload.name, payload.email, payload.password)
+        user = await register_user(payload.name, payload.email, payload.password)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except HasherBusyError as exc:
+        raise _busy_error(exc) from exc
 
     request.session["user_id"] = user.id
     return AuthStateResponse(authenticated=True, user=user)
@@ -129,7 +241,10 @@ async def register(request: Request, payload: AuthRegisterRequest) -> AuthStateR
 
 @app.post("/api/auth/login", response_model=AuthStateResponse)
 async def login(request: Request, payload: AuthLoginRequest) -> AuthStateResponse:
-    user = authenticate_user(payload.email, payload.password)
+    try:
+        user = await authenticate_user(payload.email, payload.password)
+    except HasherBusyError as exc:
+        raise _busy_error(exc) from exc
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password.")
 
@@ -143,57 +258,328 @@ async def logout(request: Request) -> Response:
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+def _subject_limit_error(payload: PlannerRequest) -> str | None:
+    if payload.subjects and len(payload.subjects) > MAX_SUBJECTS:
+        return f"Please keep the subject list to {MAX_SUBJECTS} items or fewer."
+    return None
+
+
+def _check_subject_limit(payload: PlannerRequest) -> None:
+    error = _subject_limit_error(payload)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+
 @app.post("/api/generate-strategy", response_model=StrategyResponse)
-async def generate_strategy(payload: PlannerRequest) -> StrategyResponse:
-    if payload.subjects and len(payload.subjects) > 12:
-        raise HTTPException(status_code=400, detail="Please keep the subject list to 12 items or fewer.")
+async def generate_strategy(
+    payload: PlannerRequest,
+    deadline: float | None = Query(None, gt=0, le=MAX_STRATEGY_DEADLINE),
+) -> RawJSONResponse:
+    _check_subject_limit(payload)
+    strategy, upgrade_token = await generate_strategy_within(payload, deadline)
+    headers = {"X-Upgrade-Token": upgrade_token} if upgrade_token is not None else None
+    return RawJSONResponse(strategy.model_dump_json(), headers=headers)
+
+
+@app.get("/api/generate-strategy/upgrades/{token}", response_model=StrategyResponse)
+async def strategy_upgrade(token: str, wait: float = Query(0, ge=0, le=MAX_UPGRADE_WAIT)) -> Response:
+    try:
+        done, strategy = await collect_upgrade(token, wait)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upgrade not found or expired.") from None
+    if not done:
+        return FastJSONResponse({"status": "pending"}, status_code=status.HTTP_202_ACCEPTED, headers={"Retry-After": "1"})
+    return RawJSONResponse(strategy.model_dump_json())
+
+
+@app.post("/api/generate-strategy/stream")
+async def generate_strategy_stream(
+    payload: PlannerRequest,
+    deadline: float | None = Query(None, gt=0, le=MAX_STRATEGY_DEADLINE),
+) -> StreamingResponse:
+    _check_subject_limit(payload)
+
+    async def events():
+        async for event, data in stream_ai_strategy(payload, deadline):
+            yield f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors(include_url=False)
+    )
+
 
-    return generate_ai_strategy(payload)
+@app.post("/api/generate-strategy/batch")
+async def generate_strategy_batch_endpoint(payloads: list[Any]) -> StreamingResponse:
+    if not payloads:
+        raise HTTPException(status_code=400, detail="Send at least one planner request.")
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Please keep batches to {MAX_BATCH_SIZE} requests or fewer.")
+
+    async def lines():
+        accepted: list[PlannerRequest] = []
+        positions: list[int] = []
+        for index, item in enumerate(payloads):
+            # Items are validated one by one so a malformed entry fails alone instead of the whole batch.
+            try:
+                payload = PlannerRequest.model_validate(item)
+            except ValidationError as exc:
+                yield dumps({"index": index, "error": _validation_message(exc)}) + b"\n"
+                continue
+            error = _subject_limit_error(payload)
+            if error:
+                yield dumps({"index": index, "error": error}) + b"\n"
+            else:
+                accepted.append(payload)
+                positions.append(index)
+
+        async for indexes, strategy, error in generate_strategy_batch(accepted):
+            for index in indexes:
+                item = {"index": positions[index]}
+                if strategy is not None:
+                    item["strategy"] = strategy.model_dump()
+                else:
+                    item["error"] = error
+                yield dumps(item) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _build_schedule(payload: PlannerRequest, weeks: int | None) -> list[dict]:
+    return StudySchedule(payload, max_horizon_weeks=MAX_SCHEDULE_WEEKS).days(max_weeks=weeks)
+
+
+@app.post("/api/schedule", response_model=list[ScheduleDay])
+async def schedule(
+    payload: PlannerRequest,
+    weeks: int | None = Query(None, ge=1, le=MAX_SCHEDULE_WEEKS),
+) -> FastJSONResponse:
+    _check_subject_limit(payload)
+    days = await asyncio.to_thread(_build_schedule, payload, weeks)
+    return FastJSONResponse(days)
 
 
 @app.get("/api/plans", response_model=list[SavedPlanSummary])
-async def plans(request: Request) -> list[SavedPlanSummary]:
-    user = require_user(request)
-    return list_saved_plans(user.id)
+async def plans(
+    request: Request,
+    limit: int = Query(50, ge=1, le=100),
+    before: int | None = Query(None, ge=1),
+) -> FastJSONResponse:
+    # Responses returned directly skip the response_model pass; it still documents the schema.
+    user = await require_user(request)
+    saved_plans, next_cursor = await run_db(list_saved_plans, user.id, limit, before)
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return FastJSONResponse(saved_plans, headers=headers)
+
+
+def _plan_pdf_key(plan_id: int, fingerprint: str) -> str:
+    return f"plan-{plan_id}-{fingerprint}-r{RENDERER_VERSION}"
+
+
+async def _render_saved_plan_pdf(key: str, plan: SavePlanRequest | SavedPlanDetail) -> bytes:
+    async def render() -> bytes:
+        pdf_bytes = await render_plan_pdf(plan.title, plan.payload, plan.strategy)
+        await asyncio.to_thread(get_pdf_cache().set, key, pdf_bytes)
+        return pdf_bytes
+
+    # A download that arrives while the background pre-render is still running waits for it.
+    return await pdf_renders.do(key, render)
+
+
+async def _prerender_plan_pdf(user_id: int, plan_id: int, plan: SavePlanRequest) -> None:
+    try:
+        header = await run_db(get_saved_plan_header, user_id, plan_id)
+        if header is not None:
+            await _render_saved_plan_pdf(_plan_pdf_key(plan_id, header[1]), plan)
+    except Exception as exc:
+        print(f"PDF pre-render failed for plan {plan_id}: {exc}")
 
 
 @app.post("/api/plans", response_model=SavedPlanSummary, status_code=status.HTTP_201_CREATED)
-async def create_saved_plan(request: Request, payload: SavePlanRequest) -> SavedPlanSummary:
-    user = require_user(request)
-    return save_plan(user.id, payload)
+async def create_saved_plan(
+    request: Request, payload: SavePlanRequest, background_tasks: BackgroundTasks
+) -> SavedPlanSummary:
+    user = await require_user(request)
+    summary = await run_db(save_plan, user.id, payload)
+    background_tasks.add_task(_prerender_plan_pdf, user.id, summary.id, payload)
+    return summary
 
 
 @app.get("/api/plans/{plan_id}", response_model=SavedPlanDetail)
-async def plan_detail(request: Request, plan_id: int) -> SavedPlanDetail:
-    user = require_user(request)
-    plan = get_saved_plan(user.id, plan_id)
-    if plan is None:
+async def plan_detail(request: Request, plan_id: int) -> RawJSONResponse:
+    user = await require_user(request)
+    body = await run_db(get_saved_plan_json, user.id, plan_id)
+    if body is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found.")
-    return plan
+    return RawJSONResponse(body)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _pdf_filename(title: str) -> str:
+    return f"{title.lower().replace(' ', '-')}.pdf"
+
+
+def _render_error(exc: RenderBusyError | RenderTimeoutError) -> HTTPException:
+    if isinstance(exc, RenderBusyError):
+        return _busy_error(exc)
+    return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc))
+
+
+def _chunks(data: bytes, size: int = 64 * 1024) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _file_chunks(handle: BinaryIO, size: int = 64 * 1024) -> Iterator[bytes]:
+    with handle:
+        while chunk := handle.read(size):
+            yield chunk
+
+
+async def _saved_plan_pdf(user_id: int, plan_id: int, key: str) -> bytes | None:
+    pdf_bytes = await asyncio.to_thread(get_pdf_cache().get, key)
+    if pdf_bytes is None:
+        plan = await run_db(get_saved_plan, user_id, plan_id)
+        if plan is None:
+            return None
+        pdf_bytes = await _render_saved_plan_pdf(key, plan)
+    return pdf_bytes
 
 
 @app.get("/api/plans/{plan_id}/pdf")
-async def plan_pdf(request: Request, plan_id: int) -> StreamingResponse:
-    user = require_user(request)
-    plan = get_saved_plan(user.id, plan_id)
+async def plan_pdf(request: Request, plan_id: int) -> Response:
+    user = await require_user(request)
+    header = await run_db(get_saved_plan_header, user.id, plan_id)
+    if header is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found.")
+
+    # Saved plans never change, so the row fingerprint and renderer version fully identify the rendered file.
+    title, fingerprint = header
+    key = _plan_pdf_key(plan_id, fingerprint)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{_pdf_filename(title)}"'
+
+    handle = await asyncio.to_thread(get_pdf_cache().open, key)
+    if handle is not None:
+        headers["Content-Length"] = str(os.fstat(handle.fileno()).st_size)
+        return StreamingResponse(_file_chunks(handle), media_type="application/pdf", headers=headers)
+
+    plan = await run_db(get_saved_plan, user.id, plan_id)
     if plan is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found.")
+    try:
+        pdf_bytes = await _render_saved_plan_pdf(key, plan)
+    except (RenderBusyError, RenderTimeoutError) as exc:
+        raise _render_error(exc) from exc
+
+    headers["Content-Length"] = str(len(pdf_bytes))
+    return StreamingResponse(_chunks(pdf_bytes), media_type="application/pdf", headers=headers)
+
+
+async def _export_documents(user_id: int, plans: list[tuple[int, str, str]]) -> AsyncIterator[tuple[str, bytes]]:
+    # Only a small window of renders is in flight and each finished PDF is handed straight to the
+    # archive, so memory stays flat however many plans are exported.
+    window = render_service.workers * 2
+    queued = iter(plans)
+    pending: dict[asyncio.Future[bytes | None], tuple[int, str]] = {}
+    failed: list[str] = []
+    try:
+        while True:
+            for plan_id, title, fingerprint in queued:
+                key = _plan_pdf_key(plan_id, fingerprint)
+                pending[asyncio.ensure_future(_saved_plan_pdf(user_id, plan_id, key))] = (plan_id, title)
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                plan_id, title = pending.pop(task)
+                try:
+                    pdf_bytes = task.result()
+                except Exception as exc:
+                    print(f"PDF export failed for plan {plan_id}: {exc}")
+                    pdf_bytes = None
+                if pdf_bytes is None:
+                    failed.append(f"{plan_id}: {title}")
+                    continue
+                yield f"{plan_id}-{_pdf_filename(title)}", pdf_bytes
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if failed:
+        yield "failed.txt", ("Plans that could not be exported:\n" + "\n".join(failed) + "\n").encode("utf-8")
+
+
+@app.post("/api/plans/export")
+async def export_plans(request: Request, payload: PlanExportRequest) -> StreamingResponse:
+    user = await require_user(request)
+    plan_ids = list(dict.fromkeys(payload.plan_ids)) if payload.plan_ids is not None else None
+    if plan_ids is not None and len(plan_ids) > MAX_EXPORT_PLANS:
+        raise HTTPException(status_code=400, detail=f"Please export {MAX_EXPORT_PLANS} plans or fewer at a time.")
+
+    plans = await run_db(list_saved_plan_headers, user.id, plan_ids, MAX_EXPORT_PLANS + 1)
+    if plan_ids is not None and len(plans) != len(plan_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more plans were not found.")
+    if not plans:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="There are no saved plans to export.")
+    if len(plans) > MAX_EXPORT_PLANS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"You have more than {MAX_EXPORT_PLANS} saved plans. Please export them in batches with plan_ids.",
+        )
+
+    if payload.format == "pdf":
+        details = await asyncio.gather(*(run_db(get_saved_plan, user.id, plan_id) for plan_id, _, _ in plans))
+        try:
+            pdf_bytes = await render_plans_pdf(
+                "Saved study plans",
+                [(plan.title, plan.payload, plan.strategy) for plan in details if plan is not None],
+            )
+        except (RenderBusyError, RenderTimeoutError) as exc:
+            raise _render_error(exc) from exc
+        return StreamingResponse(
+            _chunks(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'attachment; filename="study-plans.pdf"'},
+        )
 
-    pdf_bytes = build_plan_pdf(plan.title, plan.payload, plan.strategy)
-    filename = f"{plan.title.lower().replace(' ', '-')}.pdf"
     return StreamingResponse(
-        iter([pdf_bytes]),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        stream_zip(_export_documents(user.id, plans)),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="study-plans.zip"'},
     )
 
 
 @app.post("/api/export-pdf")
 async def export_pdf(payload: SavePlanRequest) -> StreamingResponse:
-    pdf_bytes = build_plan_pdf(payload.title, payload.payload, payload.strategy)
-    filename = f"{payload.title.lower().replace(' ', '-')}.pdf"
+    try:
+        pdf_bytes = await render_plan_pdf(payload.title, payload.payload, payload.strategy)
+    except (RenderBusyError, RenderTimeoutError) as exc:
+        raise _render_error(exc) from exc
+
     return StreamingResponse(
-        iter([pdf_bytes]),
+        _chunks(pdf_bytes),
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={
+            "Content-Disposition": f'attachment; filename="{_pdf_filename(payload.title)}"',
+            "Content-Length": str(len(pdf_bytes)),
+        },
     )
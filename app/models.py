@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -30,6 +32,21 @@ class StrategyResponse(BaseModel):
     weekly_plan: list[str]
     risk_alerts: list[str]
     focus_subjects: list[str]
+    sources: dict[str, str] = Field(default_factory=dict)
+
+
+class ScheduleSlot(BaseModel):
+    subject: str
+    hours: float
+    activity: str
+
+
+class ScheduleDay(BaseModel):
+    date: str
+    week: int
+    phase: str
+    hours: float
+    slots: list[ScheduleSlot]
 
 
 class AuthRegisterRequest(BaseModel):
@@ -75,3 +92,8 @@ class SavedPlanDetail(BaseModel):
     created_at: str
     payload: PlannerRequest
     strategy: StrategyResponse
+
+
+class PlanExportRequest(BaseModel):
+    plan_ids: list[int] | None = Field(default=None, min_length=1)
+    format: Literal["zip", "pdf"] = "zip"
@@ -1,47 +1,118 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from io import BytesIO
+from typing import TYPE_CHECKING
 
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 
 from app.models import PlannerRequest, StrategyResponse
 
+# The font metrics and canvas modules are imported where they are used, so the web process only
+# pays for them once a PDF is actually rendered.
+if TYPE_CHECKING:
+    from reportlab.pdfgen import canvas
 
-def _draw_wrapped_lines(pdf: canvas.Canvas, text: str, x: int, y: int, max_width: int, line_height: int) -> int:
-    words = text.split()
-    current = []
-    current_width = 0
-
-    for word in words:
-        trial = " ".join([*current, word])
-        width = pdf.stringWidth(trial, "Helvetica", 11)
-        if width <= max_width:
-            current = [*current, word]
-            current_width = width
-            continue
-
-        pdf.drawString(x, y, " ".join(current))
-        y -= line_height
-        current = [word]
-        current_width = pdf.stringWidth(word, "Helvetica", 11)
+
+# Bump whenever the PDF layout changes so cached renders of saved plans are not served again.
+RENDERER_VERSION = 2
+
+
+BODY_FONT = "Helvetica"
+BODY_FONT_SIZE = 11
+BREAK_AFTER = "/-.?&=_"
+
+
+def preload_fonts() -> None:
+    from reportlab.pdfbase.pdfmetrics import getFont
+
+    for font_name in (BODY_FONT, "Helvetica-Bold"):
+        getFont(font_name)
+    wrap_text("Warm the glyph width cache with a typical line of plan text.", 400)
+
+
+@lru_cache(maxsize=16384)
+def _text_width(text: str, font_name: str, font_size: float) -> float:
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    return stringWidth(text, font_name, font_size)
+
+
+def _split_long_token(token: str, max_width: float, font_name: str, font_size: float) -> list[str]:
+    # Break tokens wider than a whole line, such as URLs, after the last natural separator that fits,
+    # or with a hyphen when there is none.
+    hyphen_width = _text_width("-", font_name, font_size)
+    pieces: list[str] = []
+    start = 0
+    while start < len(token):
+        width = 0.0
+        end = start
+        while end < len(token):
+            char_width = _text_width(token[end], font_name, font_size)
+            if width + char_width + hyphen_width > max_width and end > start:
+                break
+            width += char_width
+            end += 1
+
+        if end == len(token):
+            pieces.append(token[start:])
+            break
+
+        separator = max(token.rfind(char, start + 1, end) for char in BREAK_AFTER)
+        if separator > start:
+            pieces.append(token[start : separator + 1])
+            start = separator + 1
+        else:
+            pieces.append(token[start:end] + "-")
+            start = end
+    return pieces
+
+
+def wrap_text(text: str, max_width: float, font_name: str = BODY_FONT, font_size: float = BODY_FONT_SIZE) -> list[str]:
+    # Each word is measured once; line widths are accumulated instead of re-measuring the growing line.
+    space_width = _text_width(" ", font_name, font_size)
+    lines: list[str] = []
+    current: list[str] = []
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = _text_width(word, font_name, font_size)
+        if word_width > max_width:
+            pieces = _split_long_token(word, max_width, font_name, font_size)
+        else:
+            pieces = [word]
+
+        for piece in pieces:
+            piece_width = word_width if len(pieces) == 1 else _text_width(piece, font_name, font_size)
+            if current and current_width + space_width + piece_width <= max_width:
+                current.append(piece)
+                current_width += space_width + piece_width
+                continue
+
+            if current:
+                lines.append(" ".join(current))
+            current = [piece]
+            current_width = piece_width
 
     if current:
-        pdf.drawString(x, y, " ".join(current))
+        lines.append(" ".join(current))
+    return lines
+
+
+def _draw_wrapped_lines(pdf: canvas.Canvas, text: str, x: int, y: int, max_width: int, line_height: int) -> int:
+    for line in wrap_text(text, max_width):
+        pdf.drawString(x, y, line)
         y -= line_height
 
     return y
 
 
-def build_plan_pdf(title: str, payload: PlannerRequest, strategy: StrategyResponse) -> bytes:
-    buffer = BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
+def _draw_plan(pdf: canvas.Canvas, title: str, payload: PlannerRequest, strategy: StrategyResponse) -> None:
     width, height = A4
     x = 48
     y = height - 54
     max_width = int(width - 96)
 
-    pdf.setTitle(title)
     pdf.setFont("Helvetica-Bold", 18)
     pdf.drawString(x, y, title)
     y -= 28
@@ -86,6 +157,50 @@ def build_plan_pdf(title: str, payload: PlannerRequest, strategy: StrategyRespon
             y = _draw_wrapped_lines(pdf, bullet_text, x, y, max_width, 14)
             y -= 4
 
+
+def build_plan_pdf(title: str, payload: PlannerRequest, strategy: StrategyResponse) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(title)
+    _draw_plan(pdf, title, payload, strategy)
+    pdf.save()
+    return buffer.getvalue()
+
+
+def build_plans_pdf(title: str, plans: list[tuple[str, PlannerRequest, StrategyResponse]]) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    x = 48
+    y = height - 54
+
+    pdf.setTitle(title)
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawString(x, y, "Contents")
+    y -= 28
+
+    # Contents entries link to bookmarks that are only defined further down; ReportLab resolves the
+    # names when the document is saved. The same bookmarks feed the viewer's outline panel.
+    pdf.setFont("Helvetica", 11)
+    for index, (plan_title, payload, _) in enumerate(plans, start=1):
+        if y < 80:
+            pdf.showPage()
+            y = height - 54
+            pdf.setFont("Helvetica", 11)
+        entry = f"{index}. {plan_title} ({payload.exam_name}, {payload.target_date})"
+        pdf.drawString(x, y, entry)
+        pdf.linkRect("", f"plan-{index}", (x, y - 3, x + _text_width(entry, BODY_FONT, BODY_FONT_SIZE), y + 11))
+        y -= 16
+
+    for index, (plan_title, payload, strategy) in enumerate(plans, start=1):
+        pdf.showPage()
+        pdf.bookmarkPage(f"plan-{index}")
+        pdf.addOutlineEntry(plan_title, f"plan-{index}", level=0)
+        _draw_plan(pdf, plan_title, payload, strategy)
+
     pdf.save()
-    buffer.seek(0)
     return buffer.getvalue()
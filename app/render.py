@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from app.executors import BoundedExecutor
+from app.metrics import observe, operation_duration, registry
+from app.models import PlannerRequest, StrategyResponse
+from app.pdf import build_plan_pdf, build_plans_pdf, preload_fonts
+
+T = TypeVar("T")
+
+
+class RenderBusyError(RuntimeError):
+    pass
+
+
+class RenderTimeoutError(TimeoutError):
+    pass
+
+
+render_pending = registry.gauge(
+    "planner_pdf_render_pending",
+    "PDF render jobs queued or running in the worker processes.",
+)
+render_rejected = registry.counter(
+    "planner_pdf_render_rejected_total",
+    "PDF render jobs rejected because the queue was full.",
+)
+render_timeouts = registry.counter(
+    "planner_pdf_render_timeouts_total",
+    "PDF render jobs that took longer than the render timeout.",
+)
+
+
+def _warm_worker() -> None:
+    preload_fonts()
+
+
+def _ready() -> None:
+    pass
+
+
+def _timed_call(function: Callable[..., T], *args: Any) -> tuple[T, float]:
+    # Runs in a worker, whose copy of the metrics registry is never scraped, so the duration is
+    # sent back and recorded by the parent.
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def _worker_context() -> Any:
+    # The app is multithreaded by the time the pool starts, and a forked child can inherit a lock
+    # some other thread was holding. Forkserver and spawn start workers from a clean process.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Workers are forked from a server that has already imported the PDF code and ReportLab.
+    context.set_forkserver_preload(["app.pdf"])
+    return context
+
+
+class RenderService(BoundedExecutor):
+    def __init__(self, workers: int, max_pending: int, timeout_seconds: float) -> None:
+        super().__init__(workers, max_pending, render_pending, render_rejected)
+        self.timeout_seconds = timeout_seconds
+
+    @classmethod
+    def from_env(cls) -> RenderService:
+        return cls(
+            workers=int(os.getenv("PDF_RENDER_WORKERS", min(4, os.cpu_count() or 1))),
+            max_pending=int(os.getenv("PDF_RENDER_MAX_PENDING", 32)),
+            timeout_seconds=float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", 30)),
+        )
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=_worker_context(), initializer=_warm_worker)
+
+    def busy_error(self) -> Exception:
+        return RenderBusyError("Too many PDFs are being rendered right now. Please retry shortly.")
+
+    def start(self) -> None:
+        # Starting every worker up front keeps process startup and font loading off the first downloads.
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_ready)
+
+    async def run_timed(self, operation: str, function: Callable[..., T], *args: Any) -> T:
+        result, elapsed = await self.run(_timed_call, function, *args)
+        operation_duration.observe(elapsed, operation=operation)
+        return result
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        # Timed-out renders keep their slot until the worker finishes them.
+        executor = self._get_executor()
+        try:
+            future = self.submit(executor, function, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            render_timeouts.inc()
+            raise RenderTimeoutError("Rendering the PDF took too long. Please try again.") from exc
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def _reset(self, executor: Executor) -> None:
+        # A worker that dies breaks the whole pool; the next job starts a fresh one.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+render_service = RenderService.from_env()
+
+
+async def render_plan_pdf(title: str, payload: PlannerRequest, strategy: StrategyResponse) -> bytes:
+    # ReportLab holds the GIL for the whole render, so PDFs are built in worker processes.
+    with observe("render_plan_pdf"):
+        return await render_service.run_timed("build_plan_pdf", build_plan_pdf, title, payload, strategy)
+
+
+async def render_plans_pdf(title: str, plans: list[tuple[str, PlannerRequest, StrategyResponse]]) -> bytes:
+    with observe("render_plans_pdf"):
+        return await render_service.run_timed("build_plans_pdf", build_plans_pdf, title, plans)
+
+
+class _ZipSink:
+    # zipfile falls back to data descriptors when the target cannot tell() or seek(), which lets
+    # each member be flushed to the client as soon as it is written.
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(documents: AsyncIterator[tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    sink = _ZipSink()
+    # PDFs are already compressed, so members are stored rather than deflated again.
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in documents:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+from app.models import PlannerRequest
+from app.scoring import apportion, phase_for_days_left, rank_subject_batches
+
+
+DAY_WEIGHTS = (1, 1, 1, 1, 1, 1.5, 1.5)  # Monday to Sunday
+SLOT_HOURS = 0.5
+MAX_BLOCK_HOURS = 2.0
+DEFAULT_HORIZON_WEEKS = 12
+MAX_HORIZON_WEEKS = 52
+
+FINAL_REVISION_ACTIVITIES = {
+    "concept rebuild": "high-yield revision",
+    "timed drilling": "mock correction",
+    "mixed revision": "active recall",
+}
+
+
+def _target_date(payload: PlannerRequest) -> date | None:
+    try:
+        return date.fromisoformat(payload.target_date)
+    except ValueError:
+        return None
+
+
+class StudySchedule:
+    def __init__(
+        self,
+        payload: PlannerRequest,
+        start: date | None = None,
+        horizon_weeks: int = DEFAULT_HORIZON_WEEKS,
+        max_horizon_weeks: int = MAX_HORIZON_WEEKS,
+    ) -> None:
+        self.start = start or date.today()
+        self.horizon_weeks = horizon_weeks
+        self.max_horizon_weeks = max_horizon_weeks
+        self._weeks: list[list[dict[str, Any]]] = []
+        self._set_payload(payload)
+
+    def _set_payload(self, payload: PlannerRequest) -> None:
+        self.payload = payload
+        self.ranked = rank_subject_batches([payload])[0]
+        self.exam_date = _target_date(payload)
+        if self.exam_date is not None and self.exam_date > self.start:
+            self.end = self.exam_date
+        else:
+            self.end = self.start + timedelta(weeks=self.horizon_weeks)
+        # Far-off exam dates still set the phases, but the calendar itself stops at the cap.
+        self.end = min(self.end, self.start + timedelta(weeks=self.max_horizon_weeks))
+        self._day_capacity = apportion(payload.weekly_hours, DAY_WEIGHTS, minimum=0, granularity=SLOT_HOURS)
+
+    def _signature(self) -> tuple[Any, ...]:
+        # exam_date as well as end: with the horizon capped, a moved exam can leave end unchanged
+        # while every phase shifts.
+        return (
+            self.end,
+            self.exam_date,
+            self.payload.weekly_hours,
+            tuple((subject["name"], subject["pressure"], subject["mode"]) for subject in self.ranked),
+        )
+
+    @property
+    def week_count(self) -> int:
+        return -(-(self.end - self.start).days // 7)
+
+    def _week_dates(self, week: int) -> list[date]:
+        first = self.start + timedelta(weeks=week)
+        return [first + timedelta(days=offset) for offset in range(7) if first + timedelta(days=offset) < self.end]
+
+    def _activity(self, subject: dict[str, Any], phase: str) -> str:
+        if phase == "Final revision":
+            return FINAL_REVISION_ACTIVITIES[subject["mode"]]
+        return subject["mode"]
+
+    def _build_days(self, week: int, dates: list[date]) -> list[dict[str, Any]]:
+        capacities = [self._day_capacity[day.weekday()] for day in dates]
+        subject_hours = apportion(
+            sum(capacities),
+            [subject["pressure"] for subject in self.ranked],
+            minimum=SLOT_HOURS,
+            granularity=SLOT_HOURS,
+        )
+
+        # Interleave subjects in blocks of at most MAX_BLOCK_HOURS so no day is a single-subject marathon.
+        remaining = [[subject, hours] for subject, hours in zip(self.ranked, subject_hours) if hours > 0]
+        blocks: deque[list[Any]] = deque()
+        while remaining:
+            for entry in remaining:
+                block = min(MAX_BLOCK_HOURS, entry[1])
+                blocks.append([entry[0], block])
+                entry[1] -= block
+            remaining = [entry for entry in remaining if entry[1] > 0]
+
+        days: list[dict[str, Any]] = []
+        for day, capacity in zip(dates, capacities):
+            days_left = (self.exam_date - day).days if self.exam_date is not None else None
+            phase = phase_for_days_left(days_left)
+            slots: list[dict[str, Any]] = []
+            free = capacity
+            while free > 0 and blocks:
+                subject, hours = blocks[0]
+                used = min(hours, free)
+                if slots and slots[-1]["subject"] == subject["name"]:
+                    slots[-1]["hours"] += used
+                else:
+                    slots.append({"subject": subject["name"], "hours": used, "activity": self._activity(subject, phase)})
+                free -= used
+                if used < hours:
+                    blocks[0][1] = hours - used
+                else:
+                    blocks.popleft()
+            days.append(
+                {
+                    "date": day.isoformat(),
+                    "week": week + 1,
+                    "phase": phase,
+                    "hours": capacity,
+                    "slots": slots,
+                }
+            )
+        return days
+
+    def weeks(self) -> Iterator[list[dict[str, Any]]]:
+        week = 0
+        while week < self.week_count:
+            if week == len(self._weeks):
+                self._weeks.append(self._build_days(week, self._week_dates(week)))
+            yield self._weeks[week]
+            week += 1
+
+    def days(self, max_weeks: int | None = None) -> list[dict[str, Any]]:
+        days: list[dict[str, Any]] = []
+        for index, week in enumerate(self.weeks()):
+            if max_weeks is not None and index >= max_weeks:
+                break
+            days.extend(week)
+        return days
+
+    def replan(self, payload: PlannerRequest, effective: date | None = None) -> int:
+        effective = max(effective or date.today(), self.start)
+        previous = self._signature()
+        self._set_payload(payload)
+        if self._signature() == previous:
+            return 0
+
+        # Days before the effective date stay as planned; the rest of that week is rebuilt now and
+        # later weeks are dropped so weeks() rebuilds them lazily with the new inputs.
+        week = (effective - self.start).days // 7
+        recomputed = 0
+        if week < len(self._weeks):
+            kept = [day for day in self._weeks[week] if day["date"] < effective.isoformat()]
+            rebuilt = self._build_days(week, [day for day in self._week_dates(week) if day >= effective])
+            self._weeks[week] = kept + rebuilt
+            recomputed = len(rebuilt)
+            del self._weeks[week + 1 :]
+        return recomputed
+
+    def update_subject(self, name: str, effective: date | None = None, **changes: Any) -> int:
+        if not any(subject.name == name for subject in self.payload.subjects):
+            raise ValueError(f"Unknown subject: {name}")
+
+        subjects = [
+            subject.model_copy(update=changes) if subject.name == name else subject
+            for subject in self.payload.subjects
+        ]
+        return self.replan(self.payload.model_copy(update={"subjects": subjects}), effective)
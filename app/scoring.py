@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Sequence
+
+from app.models import PlannerRequest
+
+
+FOCUS_MODES = ("concept rebuild", "timed drilling", "mixed revision")
+NUMPY_MIN_SUBJECTS = 256
+
+
+@dataclass(slots=True)
+class SubjectColumns:
+    names: list[str] = field(default_factory=list)
+    plan_index: list[int] = field(default_factory=list)
+    priority: list[int] = field(default_factory=list)
+    current_level: list[int] = field(default_factory=list)
+    target_level: list[int] = field(default_factory=list)
+    coverage: list[int] = field(default_factory=list)
+    mock_score: list[int] = field(default_factory=list)
+    study_styles: list[str] = field(default_factory=list)
+    weekly_hours: list[int] = field(default_factory=list)
+
+    @classmethod
+    def from_payloads(cls, payloads: Sequence[PlannerRequest]) -> SubjectColumns:
+        columns = cls()
+        for plan, payload in enumerate(payloads):
+            columns.study_styles.append(payload.study_style)
+            columns.weekly_hours.append(payload.weekly_hours)
+            for subject in payload.subjects:
+                columns.names.append(subject.name)
+                columns.plan_index.append(plan)
+                columns.priority.append(subject.priority)
+                columns.current_level.append(subject.current_level)
+                columns.target_level.append(subject.target_level)
+                columns.coverage.append(subject.syllabus_coverage)
+                columns.mock_score.append(subject.mock_score)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass(slots=True)
+class ScoredColumns:
+    # Every column is in ranked order: grouped by plan, then by descending pressure.
+    order: list[int]
+    plan_index: list[int]
+    gap: list[int]
+    pressure: list[float]
+    readiness: list[int]
+    mode: list[int]
+    hours: list[int]
+
+
+def phase_for_days_left(days_left: int | None) -> str:
+    if days_left is None:
+        return "Preparation"
+    if days_left <= 30:
+        return "Final revision"
+    if days_left <= 75:
+        return "Acceleration"
+    if days_left <= 150:
+        return "Build-up"
+    return "Foundation"
+
+
+def _focus_mode_code(study_style: str, coverage: int, mock_score: int) -> int:
+    if study_style == "Concept-first" or coverage < 45:
+        return 0
+    if study_style == "Practice-heavy" or mock_score < 55:
+        return 1
+    return 2
+
+
+def apportion(
+    total: float,
+    weights: Sequence[float],
+    *,
+    minimum: float = 1,
+    granularity: float = 1,
+) -> list[float]:
+    count = len(weights)
+    if not count:
+        return []
+
+    units = max(0, round(total / granularity))
+    min_units = max(0, math.ceil(minimum / granularity - 1e-9))
+    if sum(weights) <= 0:
+        weights = [1.0] * count
+    by_weight = sorted(range(count), key=lambda index: (-weights[index], index))
+    allocated = [0] * count
+
+    if units <= min_units * count:
+        # Not enough budget for every minimum: the heaviest subjects get theirs first.
+        for index in by_weight:
+            share = min(min_units, units)
+            allocated[index] = share
+            units -= share
+        allocated[by_weight[0]] += units
+        return _scale_units(allocated, granularity)
+
+    # Subjects whose proportional share falls below the minimum are pinned to it, lightest first.
+    # Pinning one only lowers everybody else's share, so the pinned set is a prefix of this order.
+    active = by_weight[::-1]
+    remaining_weight = float(sum(weights))
+    budget = units
+    pinned = 0
+    while pinned < count and weights[active[pinned]] / remaining_weight * budget < min_units:
+        allocated[active[pinned]] = min_units
+        budget -= min_units
+        remaining_weight -= weights[active[pinned]]
+        pinned += 1
+
+    # Largest remainder over the rest; ties go to the heavier, then earlier, subject.
+    fractions: list[tuple[float, int]] = []
+    for index in active[pinned:]:
+        quota = weights[index] / remaining_weight * budget
+        whole = math.floor(quota)
+        allocated[index] = whole
+        fractions.append((quota - whole, index))
+    leftover = budget - sum(allocated[index] for index in active[pinned:])
+    fractions.sort(key=lambda item: (-item[0], -weights[item[1]], item[1]))
+    for _, index in fractions[:leftover]:
+        allocated[index] += 1
+
+    return _scale_units(allocated, granularity)
+
+
+def _scale_units(allocated: list[int], granularity: float) -> list[float]:
+    if granularity == 1:
+        return allocated
+    return [round(units * granularity, 6) for units in allocated]
+
+
+def allocate_hours(total_hours: int, pressures: Sequence[float]) -> list[int]:
+    return apportion(total_hours, pressures)
+
+
+def _score_python(columns: SubjectColumns) -> ScoredColumns:
+    gap = [max(target - current, 0) for target, current in zip(columns.target_level, columns.current_level)]
+    pressure = [
+        gap_value * 0.42 + priority * 10 + (100 - coverage) * 0.26 + (100 - mock) * 0.22
+        for gap_value, priority, coverage, mock in zip(gap, columns.priority, columns.coverage, columns.mock_score)
+    ]
+    readiness = [
+        round(min(100, max(0, current * 0.42 + mock * 0.34 + coverage * 0.24)))
+        for current, mock, coverage in zip(columns.current_level, columns.mock_score, columns.coverage)
+    ]
+    mode = [
+        _focus_mode_code(columns.study_styles[plan], coverage, mock)
+        for plan, coverage, mock in zip(columns.plan_index, columns.coverage, columns.mock_score)
+    ]
+
+    # Stable sort keeps input order for equal pressure, matching list.sort(reverse=True).
+    order = sorted(range(len(columns)), key=lambda index: (columns.plan_index[index], -pressure[index]))
+    plan_index = [columns.plan_index[index] for index in order]
+    ranked_pressure = [pressure[index] for index in order]
+
+    hours: list[int] = []
+    start = 0
+    while start < len(order):
+        end = start
+        while end < len(order) and plan_index[end] == plan_index[start]:
+            end += 1
+        hours.extend(allocate_hours(columns.weekly_hours[plan_index[start]], ranked_pressure[start:end]))
+        start = end
+
+    return ScoredColumns(
+        order=order,
+        plan_index=plan_index,
+        gap=[gap[index] for index in order],
+        pressure=ranked_pressure,
+        readiness=[readiness[index] for index in order],
+        mode=[mode[index] for index in order],
+        hours=hours,
+    )
+
+
+@lru_cache(maxsize=None)
+def _numpy() -> Any:
+    # NumPy adds a few hundred milliseconds to startup and only pays off for large batches.
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def _score_numpy(columns: SubjectColumns) -> ScoredColumns:
+    np = _numpy()
+    plan_index = np.asarray(columns.plan_index, dtype=np.int64)
+    priority = np.asarray(columns.priority, dtype=np.int64)
+    current = np.asarray(columns.current_level, dtype=np.int64)
+    target = np.asarray(columns.target_level, dtype=np.int64)
+    coverage = np.asarray(columns.coverage, dtype=np.int64)
+    mock = np.asarray(columns.mock_score, dtype=np.int64)
+
+    gap = np.maximum(target - current, 0)
+    pressure = gap * 0.42 + priority * 10 + (100 - coverage) * 0.26 + (100 - mock) * 0.22
+    readiness = np.rint(np.clip(current * 0.42 + mock * 0.34 + coverage * 0.24, 0, 100)).astype(np.int64)
+
+    styles = np.asarray(columns.study_styles, dtype=object)[plan_index]
+    concept = (styles == "Concept-first") | (coverage < 45)
+    drilling = (styles == "Practice-heavy") | (mock < 55)
+    mode = np.where(concept, 0, np.where(drilling, 1, 2))
+
+    order = np.lexsort((np.arange(len(plan_index)), -pressure, plan_index))
+    plan_index = plan_index[order]
+    pressure = pressure[order]
+
+    plan_count = len(columns.weekly_hours)
+    position = np.arange(len(plan_index))
+    weekly_hours = np.asarray(columns.weekly_hours, dtype=np.int64)[plan_index]
+    total_weight = np.bincount(plan_index, weights=pressure, minlength=plan_count)[plan_index]
+    quota = pressure / total_weight * weekly_hours
+    hours = np.floor(quota).astype(np.int64)
+
+    # Largest remainder within each plan: rank subjects by fractional part and hand out the leftover hours.
+    fraction = quota - hours
+    leftover = np.asarray(columns.weekly_hours, dtype=np.int64) - np.bincount(plan_index, weights=hours, minlength=plan_count).astype(np.int64)
+    by_fraction = np.lexsort((position, -pressure, -fraction, plan_index))
+    plan_start = np.searchsorted(plan_index, np.arange(plan_count))
+    rank = np.empty_like(position)
+    rank[by_fraction] = position - plan_start[plan_index[by_fraction]]
+    hours += rank < leftover[plan_index]
+
+    # Plans where some subject's share is below the one-hour minimum need the pinning pass in apportion.
+    needs_minimum = np.bincount(plan_index, weights=quota < 1, minlength=plan_count) > 0
+    plan_end = plan_start + np.bincount(plan_index, minlength=plan_count)
+    for plan in np.flatnonzero(needs_minimum).tolist():
+        start, end = plan_start[plan], plan_end[plan]
+        hours[start:end] = apportion(columns.weekly_hours[plan], pressure[start:end].tolist())
+
+    return ScoredColumns(
+        order=order.tolist(),
+        plan_index=plan_index.tolist(),
+        gap=gap[order].tolist(),
+        pressure=pressure.tolist(),
+        readiness=readiness[order].tolist(),
+        mode=mode[order].tolist(),
+        hours=hours.tolist(),
+    )
+
+
+def score_columns(columns: SubjectColumns, use_numpy: bool | None = None) -> ScoredColumns:
+    if use_numpy is None:
+        use_numpy = len(columns) >= NUMPY_MIN_SUBJECTS
+    if use_numpy and len(columns) and _numpy() is not None:
+        return _score_numpy(columns)
+    return _score_python(columns)
+
+
+def rank_subject_batches(payloads: Sequence[PlannerRequest], use_numpy: bool | None = None) -> list[list[dict[str, Any]]]:
+    columns = SubjectColumns.from_payloads(payloads)
+    scored = score_columns(columns, use_numpy)
+
+    ranked: list[list[dict[str, Any]]] = [[] for _ in payloads]
+    for position, index in enumerate(scored.order):
+        ranked[scored.plan_index[position]].append(
+            {
+                "name": columns.names[index],
+                "priority": columns.priority[index],
+                "coverage": columns.coverage[index],
+                "mock_score": columns.mock_score[index],
+                "current_level": columns.current_level[index],
+                "target_level": columns.target_level[index],
+                "gap": scored.gap[position],
+                "pressure": scored.pressure[position],
+                "readiness": scored.readiness[position],
+                "mode": FOCUS_MODES[scored.mode[position]],
+                "hours": scored.hours[position],
+            }
+        )
+    return ranked
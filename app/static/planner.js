@@ -303,10 +303,96 @@ const postJson = async (url, payload) => {
   return response.status === 204 ? null : response.json();
 };
 
-const renderSavedPlans = (plans) => {
-  savedPlansNode.innerHTML = "";
+const pollUpgrade = async (token, payload) => {
+  // The server answered with the fallback plan inside its deadline; swap in the AI plan once it lands.
+  for (let attempt = 0; attempt < 6; attempt += 1) {
+    const response = await fetch(`/api/generate-strategy/upgrades/${token}?wait=20`).catch(() => null);
+    if (!response || currentPayload !== payload) return;
+    if (response.status === 202) continue;
+    if (response.ok) {
+      const result = await response.json();
+      if (result.mode === "ai") renderStrategy(result);
+    }
+    return;
+  }
+};
+
+const generateStrategy = async (payload) => {
+  const response = await fetch("/api/generate-strategy", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: "Request failed." }));
+    throw new Error(error.detail || "Request failed.");
+  }
+
+  const result = await response.json();
+  const token = response.headers.get("X-Upgrade-Token");
+  // Deferred so the fallback plan is rendered before any upgrade can replace it.
+  if (token) setTimeout(() => pollUpgrade(token, payload), 0);
+  return result;
+};
+
+const renderSection = (name, value) => {
+  if (name === "summary") summaryNode.textContent = value;
+  if (name === "next_steps") renderList(nextStepsNode, value);
+  if (name === "weekly_plan") renderList(weeklyPlanNode, value);
+  if (name === "risk_alerts") renderList(riskAlertsNode, value);
+  if (name === "focus_subjects") renderChips(value);
+};
+
+const streamStrategy = async (payload) => {
+  const response = await fetch("/api/generate-strategy/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ detail: "Request failed." }));
+    throw new Error(error.detail || "Request failed.");
+  }
 
-  if (!plans.length) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      const eventLine = block.split("\n").find((line) => line.startsWith("event: "));
+      const dataLine = block.split("\n").find((line) => line.startsWith("data: "));
+      if (!eventLine || !dataLine) continue;
+
+      const data = JSON.parse(dataLine.slice(6));
+      if (eventLine.slice(7) === "section") {
+        renderSection(data.name, data.value);
+      } else if (eventLine.slice(7) === "done") {
+        result = data;
+      }
+    }
+  }
+
+  return result;
+};
+
+const renderSavedPlans = (plans, { append = false, nextCursor = null } = {}) => {
+  if (!append) savedPlansNode.innerHTML = "";
+  savedPlansNode.querySelector(".load-more-plans")?.remove();
+
+  if (!append && !plans.length) {
     savedPlansNode.className = "saved-plans empty-state";
     savedPlansNode.textContent = "No saved plans yet. Generate one and save it.";
     return;
@@ -347,10 +433,19 @@ const renderSavedPlans = (plans) => {
 
     savedPlansNode.appendChild(card);
   });
+
+  if (nextCursor) {
+    const loadMore = document.createElement("button");
+    loadMore.type = "button";
+    loadMore.className = "ghost-button load-more-plans";
+    loadMore.textContent = "Load more";
+    loadMore.addEventListener("click", () => refreshSavedPlans(nextCursor));
+    savedPlansNode.appendChild(loadMore);
+  }
 };
 
-const refreshSavedPlans = async () => {
-  const response = await fetch("/api/plans");
+const refreshSavedPlans = async (cursor = null) => {
+  const response = await fetch(cursor ? `/api/plans?before=${cursor}` : "/api/plans");
   if (response.status === 401) {
     window.location.href = "/login";
     return;
@@ -360,7 +455,10 @@ const refreshSavedPlans = async () => {
     savedPlansNode.textContent = "Unable to load saved plans right now.";
     return;
   }
-  renderSavedPlans(await response.json());
+  renderSavedPlans(await response.json(), {
+    append: Boolean(cursor),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  });
 };
 
 plannerForm.addEventListener("submit", async (event) => {
@@ -368,8 +466,15 @@ plannerForm.addEventListener("submit", async (event) => {
   setStatus("Generating strategy...", "loading");
   currentPayload = buildPayload();
 
+  renderList(nextStepsNode, []);
+  renderList(weeklyPlanNode, []);
+  renderList(riskAlertsNode, []);
+  renderChips([]);
+
   try {
-    const result = await postJson("/api/generate-strategy", currentPayload);
+    const result = window.ReadableStream
+      ? await streamStrategy(currentPayload)
+      : await generateStrategy(currentPayload);
     if (result) renderStrategy(result);
   } catch (error) {
     setStatus("Generation failed", "error");
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class StrategySectionParser:
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect = "key"
+        self._key: str | None = None
+        self._value_start: int | None = None
+        self.started = False
+        self.finished = False
+
+    def _complete(self, end: int) -> list[tuple[str, Any]]:
+        key, start = self._key, self._value_start
+        self._key, self._value_start = None, None
+        self._expect = "after"
+        if key is None or start is None:
+            return []
+        try:
+            return [(key, json.loads(self.text[start:end]))]
+        except json.JSONDecodeError:
+            return []
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.text += chunk
+        completed: list[tuple[str, Any]] = []
+        text = self.text
+
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self.finished:
+                break
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(text[self._string_start : index + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1 and self._expect == "value":
+                        completed.extend(self._complete(index + 1))
+                continue
+
+            if self._depth == 0:
+                # Skip markdown fences or any prose before the object opens.
+                if char == "{":
+                    self._depth = 1
+                    self._expect = "key"
+                    self.started = True
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+                if self._depth == 1 and self._expect == "value" and self._value_start is None:
+                    self._value_start = index
+            elif char in "[{":
+                if self._depth == 1 and self._expect == "value" and self._value_start is None:
+                    self._value_start = index
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "value":
+                    completed.extend(self._complete(index + 1))
+                elif self._depth == 0:
+                    if self._expect == "value":
+                        completed.extend(self._complete(index))
+                    self.finished = True
+            elif self._depth == 1:
+                if char == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif char == ",":
+                    if self._expect == "value":
+                        completed.extend(self._complete(index))
+                    self._expect = "key"
+                elif not char.isspace() and self._expect == "value" and self._value_start is None:
+                    self._value_start = index
+
+        self._pos = len(text)
+        return completed
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.scoring import apportion  # noqa: E402
+
+
+def legacy_allocate_hours(total_hours: int, pressures: list[float]) -> list[int]:
+    # The per-subject rounding allocator that apportion replaced, kept for comparison.
+    if not pressures:
+        return []
+
+    total_weight = sum(pressures) or 1
+    remaining = total_hours
+    hours: list[int] = []
+    for index, pressure in enumerate(pressures):
+        if index == len(pressures) - 1:
+            hours.append(max(1, remaining))
+        else:
+            allocated = max(1, round((pressure / total_weight) * total_hours))
+            remaining -= allocated
+            hours.append(allocated)
+    return hours
+
+
+def random_cases(count: int, seed: int) -> list[tuple[int, list[float]]]:
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(count):
+        pressures = sorted((rng.uniform(10, 120) for _ in range(rng.randint(1, 12))), reverse=True)
+        cases.append((rng.randint(1, 100), pressures))
+    return cases
+
+
+def budget_misses(cases: list[tuple[int, list[float]]]) -> dict[str, int]:
+    # The allocator properties themselves are checked in tests/test_scoring.py.
+    misses = {"apportion": 0, "legacy": 0}
+    for total_hours, pressures in cases:
+        if sum(apportion(total_hours, pressures)) != total_hours:
+            misses["apportion"] += 1
+        if sum(legacy_allocate_hours(total_hours, pressures)) != total_hours:
+            misses["legacy"] += 1
+    return {"cases": len(cases), **{f"{name}_off_budget": count for name, count in misses.items()}}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare apportion against the legacy hour allocator.")
+    parser.add_argument("--cases", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    cases = random_cases(args.cases, args.seed)
+    results = {"budget": budget_misses(cases)}
+
+    for name, allocator in (("legacy", legacy_allocate_hours), ("apportion", apportion)):
+        timings = timeit.repeat(
+            lambda: [allocator(total_hours, pressures) for total_hours, pressures in cases],
+            number=1,
+            repeat=args.repeat,
+        )
+        results[name] = {"best_us_per_call": min(timings) / len(cases) * 1_000_000}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
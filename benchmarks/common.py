@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+WORDS = (
+    "revise the core chapters then attempt timed mock tests and log every mistake in a short error notebook "
+    "before the weekend review with spaced repetition of formulas definitions and previously missed questions"
+).split()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    # Samples are seconds; reported in milliseconds so small and large paths read the same way.
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1_000 if samples else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1_000,
+        "p99_ms": percentile(samples, 0.99) * 1_000,
+        "max_ms": max(samples, default=0.0) * 1_000,
+    }
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def sample_payload(rng: random.Random, subjects: int, exam_name: str = "Board exams") -> dict[str, Any]:
+    return {
+        "exam_name": exam_name,
+        "target_date": "2027-03-01",
+        "weekly_hours": rng.randint(10, 40),
+        "target_score": rng.randint(60, 95),
+        "confidence_level": rng.randint(20, 90),
+        "stress_level": rng.randint(10, 90),
+        "study_style": rng.choice(["Balanced", "Concept-first", "Practice-heavy"]),
+        "constraints": "",
+        "subjects": [
+            {
+                "name": f"Subject {index + 1}",
+                "priority": rng.randint(1, 5),
+                "current_level": rng.randint(10, 90),
+                "target_level": rng.randint(50, 100),
+                "syllabus_coverage": rng.randint(0, 100),
+                "mock_score": rng.randint(0, 100),
+            }
+            for index in range(subjects)
+        ],
+    }
+
+
+def emit(results: dict[str, Any], output: str | None) -> None:
+    text = json.dumps(results, indent=2)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    print(text)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+LATENCY_KEYS = ("p50_ms", "p99_ms")
+THROUGHPUT_KEYS = ("ops_per_s", "flows_per_s", "requests_per_s")
+
+
+def metrics(results: dict[str, Any]) -> dict[str, float]:
+    # Flatten either suite into "name.metric" pairs so two runs can be compared key by key.
+    flat: dict[str, float] = {}
+    sections = results.get("results") or {**results.get("steps", {}), "event_loop_lag": results.get("event_loop_lag", {})}
+    for name, values in sections.items():
+        for key in (*LATENCY_KEYS, *THROUGHPUT_KEYS):
+            if key in values:
+                flat[f"{name}.{key}"] = values[key]
+    for key in THROUGHPUT_KEYS:
+        if key in results:
+            flat[key] = results[key]
+    return flat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON results and flag regressions.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change treated as a regression.")
+    args = parser.parse_args()
+
+    baseline = metrics(json.loads(args.baseline.read_text(encoding="utf-8")))
+    candidate = metrics(json.loads(args.candidate.read_text(encoding="utf-8")))
+
+    comparison: dict[str, Any] = {}
+    regressions: list[str] = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        change = (after - before) / before if before else 0.0
+        # Latency regresses when it grows, throughput when it shrinks.
+        worse = -change if key.endswith(THROUGHPUT_KEYS) else change
+        comparison[key] = {"baseline": before, "candidate": after, "change": change}
+        if worse > args.threshold:
+            regressions.append(key)
+
+    print(json.dumps({"threshold": args.threshold, "regressions": regressions, "metrics": comparison}, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
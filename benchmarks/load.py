@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from common import emit, sample_payload, summarize
+from fake_openai import FakeOpenAIServer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Drive login, generate, save, list and PDF flows through the ASGI app in-process."
+    )
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--flows", type=int, default=5, help="Flows each user runs after registering.")
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds the fake OpenAI server waits.")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--no-llm", action="store_true", help="Run without an API key so the fallback engine answers.")
+    parser.add_argument("--deadline", type=float, help="Ask generate-strategy to answer within this many seconds.")
+    parser.add_argument("--repeat-payloads", action="store_true", help="Reuse one payload so the strategy cache hits.")
+    parser.add_argument("--hash-iterations", type=int, help="Override PASSWORD_HASH_ITERATIONS for the run.")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args()
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.requests = 0
+
+    async def call(self, client: Any, step: str, method: str, url: str, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        await response.aread()
+        self.samples[step].append(time.perf_counter() - started)
+        self.requests += 1
+        if response.status_code >= 400:
+            self.errors[f"{step}:{response.status_code}"] += 1
+        return response
+
+
+async def probe_loop_lag(samples: list[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    # How late a short sleep wakes up is how long other coroutines waited behind blocking work.
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_user(app: Any, recorder: Recorder, user: int, args: argparse.Namespace, rng: random.Random) -> int:
+    import httpx
+
+    completed = 0
+    credentials = {"email": f"user{user}@example.com", "password": "benchmark-password"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://planner.test") as client:
+        await recorder.call(client, "register", "POST", "/api/auth/register", json={"name": f"User {user}", **credentials})
+        for flow in range(args.flows):
+            exam_name = "Board exams" if args.repeat_payloads else f"Exam {user}-{flow}"
+            payload = sample_payload(random.Random(0) if args.repeat_payloads else rng, args.subjects, exam_name)
+
+            await recorder.call(client, "logout", "POST", "/api/auth/logout")
+            response = await recorder.call(client, "login", "POST", "/api/auth/login", json=credentials)
+            if response.status_code != 200:
+                continue
+            params = {"deadline": args.deadline} if args.deadline else None
+            response = await recorder.call(client, "generate", "POST", "/api/generate-strategy", json=payload, params=params)
+            if response.status_code != 200:
+                continue
+            plan = {"title": f"Plan {user}-{flow}", "payload": payload, "strategy": response.json()}
+            response = await recorder.call(client, "save", "POST", "/api/plans", json=plan)
+            if response.status_code != 201:
+                continue
+            await recorder.call(client, "list", "GET", "/api/plans")
+            await recorder.call(client, "pdf", "GET", f"/api/plans/{response.json()['id']}/pdf")
+            completed += 1
+    return completed
+
+
+async def run(args: argparse.Namespace, server: FakeOpenAIServer | None) -> dict[str, Any]:
+    from app.main import app
+
+    recorder = Recorder()
+    lag: list[float] = []
+    stop = asyncio.Event()
+    rngs = [random.Random(args.seed + user) for user in range(args.users)]
+
+    async with app.router.lifespan_context(app):
+        probe = asyncio.create_task(probe_loop_lag(lag, stop))
+        started = time.perf_counter()
+        completed = await asyncio.gather(*(run_user(app, recorder, user, args, rngs[user]) for user in range(args.users)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    return {
+        "suite": "load",
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "elapsed_s": elapsed,
+        "flows_completed": sum(completed),
+        "flows_per_s": sum(completed) / elapsed,
+        "requests": recorder.requests,
+        "requests_per_s": recorder.requests / elapsed,
+        "llm_calls": server.calls if server is not None else 0,
+        "errors": dict(recorder.errors),
+        "steps": {step: summarize(samples) for step, samples in recorder.samples.items()},
+        "event_loop_lag": summarize(lag),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    workdir = Path(tempfile.mkdtemp(prefix="planner-load-"))
+
+    # Everything the app reads at import time has to be in place before app modules are imported.
+    os.environ["PDF_CACHE_DIR"] = str(workdir / "pdf_cache")
+    os.environ.pop("STRATEGY_CACHE_PERSIST", None)
+    if args.hash_iterations:
+        os.environ["PASSWORD_HASH_ITERATIONS"] = str(args.hash_iterations)
+
+    server = None
+    if args.no_llm:
+        os.environ["OPENAI_API_KEY"] = ""
+    else:
+        server = FakeOpenAIServer(latency=args.llm_latency, jitter=args.llm_jitter, failure_rate=args.llm_failure_rate)
+        server.start()
+        os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    import app.db as db
+
+    db.DATABASE_PATH = workdir / "planner.db"
+
+    try:
+        results = asyncio.run(run(args, server))
+    finally:
+        if server is not None:
+            server.shutdown()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from io import BytesIO
+from typing import Any, Callable
+
+from common import emit, random_text, sample_payload, summarize
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.ai import _build_ranked_subjects, build_fallback_strategy
+from app.auth import _hash_password, password_iterations
+from app.models import PlannerRequest, StrategyResponse
+from app.pdf import _draw_wrapped_lines, build_plan_pdf
+
+
+def measure(function: Callable[[], Any], iterations: int, warmup: int = 3) -> dict[str, float]:
+    for _ in range(warmup):
+        function()
+
+    samples: list[float] = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    result = summarize(samples)
+    result["ops_per_s"] = iterations / elapsed if elapsed else 0.0
+    return result
+
+
+def long_strategy(rng: random.Random, items: int, words: int) -> StrategyResponse:
+    return StrategyResponse(
+        mode="ai",
+        model="benchmark",
+        summary=random_text(rng, words),
+        next_steps=[random_text(rng, words) for _ in range(items)],
+        weekly_plan=[random_text(rng, words) for _ in range(items)],
+        risk_alerts=[random_text(rng, words) for _ in range(items)],
+        focus_subjects=["Subject 1", "Subject 2"],
+    )
+
+
+def draw_on_canvas(text: str) -> None:
+    pdf = canvas.Canvas(BytesIO(), pagesize=A4)
+    pdf.setFont("Helvetica", 11)
+    _draw_wrapped_lines(pdf, text, 48, 780, 499, 14)
+
+
+def cases(rng: random.Random, scale: float) -> dict[str, tuple[Callable[[], Any], int]]:
+    def count(base: int) -> int:
+        return max(1, int(base * scale))
+
+    benchmarks: dict[str, tuple[Callable[[], Any], int]] = {}
+    for subjects in (1, 4, 12):
+        payload = PlannerRequest.model_validate(sample_payload(rng, subjects))
+        benchmarks[f"build_fallback_strategy/{subjects}_subjects"] = (lambda p=payload: build_fallback_strategy(p), count(2_000))
+        benchmarks[f"build_ranked_subjects/{subjects}_subjects"] = (lambda p=payload: _build_ranked_subjects(p), count(5_000))
+
+    iterations = password_iterations()
+    benchmarks[f"hash_password/{iterations}_iterations"] = (
+        lambda: _hash_password("correct horse battery", "0123456789abcdef", iterations),
+        count(20),
+    )
+
+    payload = PlannerRequest.model_validate(sample_payload(rng, 6))
+    fallback = build_fallback_strategy(payload)
+    benchmarks["build_plan_pdf/fallback_strategy"] = (lambda: build_plan_pdf("Benchmark", payload, fallback), count(100))
+    for items, words in ((6, 40), (12, 120)):
+        strategy = long_strategy(rng, items, words)
+        benchmarks[f"build_plan_pdf/{items}x{words}_words"] = (
+            lambda s=strategy: build_plan_pdf("Benchmark", payload, s),
+            count(40),
+        )
+
+    for words in (50, 500, 5_000):
+        text = random_text(rng, words)
+        benchmarks[f"draw_wrapped_lines/{words}_words"] = (lambda t=text: draw_on_canvas(t), count(20_000 // words))
+
+    return benchmarks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the planner's CPU-bound helpers.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every iteration count by this factor.")
+    parser.add_argument("--only", default="", help="Run only benchmarks whose name contains this text.")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results: dict[str, Any] = {}
+    for name, (function, iterations) in cases(rng, args.scale).items():
+        if args.only in name:
+            results[name] = measure(function, iterations)
+
+    emit({"suite": "micro", "seed": args.seed, "scale": args.scale, "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from common import emit, sample_payload, summarize
+from fake_openai import FakeOpenAIServer
+
+PHASES = (
+    ("healthy", {"latency": 0.2, "failure_rate": 0.0}),
+    ("outage", {"latency": 1.0, "failure_rate": 1.0}),
+    ("recovered", {"latency": 0.2, "failure_rate": 0.0}),
+)
+
+
+async def run_phase(client: Any, seconds: float, users: int, rng: random.Random) -> dict[str, Any]:
+    samples: list[float] = []
+    modes: dict[str, int] = {}
+    deadline = time.perf_counter() + seconds
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            # Unique exam names keep the strategy cache out of the picture.
+            payload = sample_payload(rng, 4, f"Exam {rng.random():.12f}")
+            started = time.perf_counter()
+            response = await client.post("/api/generate-strategy", json=payload)
+            samples.append(time.perf_counter() - started)
+            mode = response.json().get("mode", "error") if response.status_code == 200 else f"http_{response.status_code}"
+            modes[mode] = modes.get(mode, 0) + 1
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return {"generate": summarize(samples), "modes": modes}
+
+
+async def run(args: argparse.Namespace, server: FakeOpenAIServer) -> dict[str, Any]:
+    import httpx
+
+    from app.breaker import breaker_rejected, breaker_transitions, llm_retries
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    phases: dict[str, Any] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://planner.test", timeout=None) as client:
+            for name, settings in PHASES:
+                server.latency = settings["latency"]
+                server.failure_rate = settings["failure_rate"]
+                calls = server.calls
+                phases[name] = await run_phase(client, args.phase_seconds, args.users, rng)
+                phases[name]["upstream_calls"] = server.calls - calls
+
+    return {
+        "suite": "outage",
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": {name: phase["generate"] for name, phase in phases.items()},
+        "phases": phases,
+        "breaker_transitions": {
+            f"{source}->{target}": breaker_transitions.value(from_state=source, to_state=target)
+            for source, target in (("closed", "open"), ("open", "half_open"), ("half_open", "open"), ("half_open", "closed"))
+        },
+        "breaker_rejected": breaker_rejected.value(),
+        "retries": {outcome: llm_retries.value(outcome=outcome) for outcome in ("attempted", "budget_exhausted")},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drive generate-strategy through a healthy, failing and recovered fake OpenAI upstream."
+    )
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--phase-seconds", type=float, default=10.0)
+    parser.add_argument("--open-seconds", type=float, default=3.0, help="LLM_BREAKER_OPEN_SECONDS for the run.")
+    parser.add_argument("--no-breaker", action="store_true", help="Never open the breaker, to compare against.")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="planner-outage-"))
+    server = FakeOpenAIServer().start()
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "sk-benchmark",
+            "OPENAI_BASE_URL": server.base_url,
+            "PDF_CACHE_DIR": str(workdir / "pdf_cache"),
+            "LLM_BREAKER_OPEN_SECONDS": str(args.open_seconds),
+        }
+    )
+    os.environ.pop("STRATEGY_CACHE_PERSIST", None)
+    if args.no_breaker:
+        os.environ["LLM_BREAKER_FAILURE_RATE"] = "2"
+
+    import app.db as db
+
+    db.DATABASE_PATH = workdir / "planner.db"
+
+    try:
+        results = asyncio.run(run(args, server))
+    finally:
+        server.shutdown()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportlab.pdfbase.pdfmetrics import stringWidth  # noqa: E402
+
+from app import pdf  # noqa: E402
+from app.models import PlannerRequest, StrategyResponse  # noqa: E402
+
+WORDS = (
+    "revise the core chapters then attempt timed mock tests and log every mistake in a short error notebook "
+    "before the weekend review with spaced repetition of formulas definitions and previously missed questions"
+).split()
+
+
+def legacy_wrap(text: str, max_width: int) -> list[str]:
+    # The line builder _draw_wrapped_lines used before wrap_text, minus the drawing.
+    lines: list[str] = []
+    current: list[str] = []
+    for word in text.split():
+        trial = " ".join([*current, word])
+        if stringWidth(trial, "Helvetica", 11) <= max_width:
+            current = [*current, word]
+            continue
+        lines.append(" ".join(current))
+        current = [word]
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def legacy_draw_wrapped_lines(canvas, text: str, x: int, y: int, max_width: int, line_height: int) -> int:
+    for line in legacy_wrap(text, max_width):
+        canvas.drawString(x, y, line)
+        y -= line_height
+    return y
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def sample_plan(rng: random.Random, items: int, words: int) -> tuple[PlannerRequest, StrategyResponse]:
+    subject = {"priority": 3, "current_level": 55, "target_level": 80, "syllabus_coverage": 60, "mock_score": 50}
+    payload = PlannerRequest(
+        exam_name="Board exams",
+        target_date="2027-03-01",
+        weekly_hours=20,
+        target_score=85,
+        confidence_level=60,
+        stress_level=50,
+        study_style="Balanced",
+        subjects=[{"name": "Physics", **subject}, {"name": "Chemistry", **subject}],
+    )
+    strategy = StrategyResponse(
+        mode="ai",
+        model="benchmark",
+        summary=random_text(rng, words),
+        next_steps=[random_text(rng, words) for _ in range(items)],
+        weekly_plan=[random_text(rng, words) for _ in range(items)],
+        risk_alerts=[random_text(rng, words) for _ in range(items)],
+        focus_subjects=["Physics", "Chemistry"],
+    )
+    return payload, strategy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare wrap_text against the legacy PDF line wrapper.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    max_width = 499
+    results: dict[str, object] = {}
+
+    # Without over-long tokens both wrappers must produce exactly the same lines.
+    for _ in range(200):
+        text = random_text(rng, rng.randint(1, 400))
+        assert pdf.wrap_text(text, max_width) == legacy_wrap(text, max_width), text
+
+    url = "https://example.com/" + "/".join(f"resources-{index}" for index in range(40))
+    wrapped = pdf.wrap_text(f"See {url} for notes", max_width)
+    assert all(stringWidth(line, "Helvetica", 11) <= max_width for line in wrapped), wrapped
+    results["long_token_lines"] = len(wrapped)
+
+    for words in (50, 500, 5_000):
+        text = random_text(rng, words)
+        timings = {}
+        for name, wrapper in (("legacy", legacy_wrap), ("wrap_text", pdf.wrap_text)):
+            best = min(timeit.repeat(lambda: wrapper(text, max_width), number=20, repeat=args.repeat)) / 20
+            timings[f"{name}_ms"] = best * 1_000
+        timings["speedup"] = timings["legacy_ms"] / timings["wrap_text_ms"]
+        results[f"wrap_{words}_words"] = timings
+
+    payload, strategy = sample_plan(rng, items=12, words=120)
+    timings = {}
+    for name, drawer in (("legacy", legacy_draw_wrapped_lines), ("wrap_text", pdf._draw_wrapped_lines)):
+        original = pdf._draw_wrapped_lines
+        pdf._draw_wrapped_lines = drawer
+        try:
+            best = min(
+                timeit.repeat(lambda: pdf.build_plan_pdf("Benchmark", payload, strategy), number=5, repeat=args.repeat)
+            )
+        finally:
+            pdf._draw_wrapped_lines = original
+        timings[f"{name}_ms"] = best / 5 * 1_000
+    timings["speedup"] = timings["legacy_ms"] / timings["wrap_text_ms"]
+    results["build_plan_pdf"] = timings
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from common import emit, random_text, sample_payload, summarize
+from micro import long_strategy, measure
+
+from pydantic import TypeAdapter
+
+from app.codec import decode_document_bytes, encode_document
+from app.models import PlannerRequest, SavedPlanDetail, SavedPlanSummary, StrategyResponse
+from app.responses import dumps, orjson
+
+
+def validated_response(adapter: TypeAdapter[Any], content: Any) -> bytes:
+    # What FastAPI does with a response_model: validate the return value again, dump it to JSON-able
+    # Python and hand that to json.dumps in JSONResponse.
+    validated = adapter.validate_python(content, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def summary_rows(rng: random.Random, count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": count - index,
+            "title": f"Plan {index}",
+            "exam_name": "Board exams",
+            "target_date": "2027-03-01",
+            "created_at": "2026-09-01T10:00:00+00:00",
+            "summary": random_text(rng, 60),
+        }
+        for index in range(count)
+    ]
+
+
+def cases(rng: random.Random, scale: float) -> dict[str, tuple[Callable[[], Any], int]]:
+    def count(base: int) -> int:
+        return max(1, int(base * scale))
+
+    benchmarks: dict[str, tuple[Callable[[], Any], int]] = {}
+    summaries = TypeAdapter(list[SavedPlanSummary])
+    for plans in (10, 100, 1_000):
+        rows = summary_rows(rng, plans)
+        iterations = count(200_000 // plans)
+        benchmarks[f"plan_list/{plans}/models_response_model"] = (
+            lambda r=rows: validated_response(summaries, [SavedPlanSummary(**row) for row in r]),
+            iterations,
+        )
+        benchmarks[f"plan_list/{plans}/trusted_rows"] = (lambda r=rows: dumps(r), iterations)
+
+    detail = TypeAdapter(SavedPlanDetail)
+    payload = encode_document(PlannerRequest.model_validate(sample_payload(rng, 12)).model_dump())
+    strategy = encode_document(long_strategy(rng, 12, 80).model_dump())
+    head = {"id": 1, "title": "Benchmark", "created_at": "2026-09-01T10:00:00+00:00"}
+
+    def detail_models() -> bytes:
+        plan = SavedPlanDetail(
+            **head,
+            payload=PlannerRequest.model_validate_json(decode_document_bytes(payload)),
+            strategy=StrategyResponse.model_validate_json(decode_document_bytes(strategy)),
+        )
+        return validated_response(detail, plan)
+
+    def detail_spliced() -> bytes:
+        start = json.dumps(head, separators=(",", ":"))
+        return b"".join(
+            (
+                start[:-1].encode(),
+                b',"payload":',
+                decode_document_bytes(payload),
+                b',"strategy":',
+                decode_document_bytes(strategy),
+                b"}",
+            )
+        )
+
+    benchmarks["plan_detail/models_response_model"] = (detail_models, count(5_000))
+    benchmarks["plan_detail/stored_bytes"] = (detail_spliced, count(5_000))
+    return benchmarks
+
+
+async def endpoints(plans: int, requests: int) -> dict[str, dict[str, float]]:
+    import httpx
+
+    from app.main import app
+
+    results: dict[str, dict[str, float]] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://planner.test") as client:
+            credentials = {"email": "bench@example.com", "password": "benchmark-password"}
+            await client.post("/api/auth/register", json={"name": "Bench", **credentials})
+            strategy = (await client.post("/api/generate-strategy", json=sample_payload(random.Random(0), 8))).json()
+            for index in range(plans):
+                plan = {"title": f"Plan {index}", "payload": sample_payload(random.Random(index), 8), "strategy": strategy}
+                await client.post("/api/plans", json=plan)
+
+            for name, url in (("GET /api/plans?limit=100", "/api/plans?limit=100"), ("GET /api/plans/{id}", "/api/plans/1")):
+                samples: list[float] = []
+                started = time.perf_counter()
+                for _ in range(requests):
+                    call_started = time.perf_counter()
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    samples.append(time.perf_counter() - call_started)
+                elapsed = time.perf_counter() - started
+                results[name] = {**summarize(samples), "requests_per_s": requests / elapsed}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare response_model serialization with trusted rows and stored JSON bytes for saved plans."
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every iteration count by this factor.")
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--plans", type=int, default=150, help="Saved plans created for the endpoint timings.")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint timing.")
+    parser.add_argument("--skip-endpoints", action="store_true", help="Only run the in-process serialization cases.")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    results = {
+        name: measure(function, iterations)
+        for name, (function, iterations) in cases(random.Random(args.seed), args.scale).items()
+        if not args.only or args.only in name
+    }
+
+    if not args.skip_endpoints:
+        workdir = Path(tempfile.mkdtemp(prefix="planner-serialization-"))
+        os.environ["PDF_CACHE_DIR"] = str(workdir / "pdf_cache")
+        os.environ["OPENAI_API_KEY"] = ""
+        os.environ["STARTUP_WARMUP"] = "0"
+
+        import app.db as db
+
+        db.DATABASE_PATH = workdir / "planner.db"
+        results.update(asyncio.run(endpoints(args.plans, args.requests)))
+
+    emit({"suite": "serialization", "orjson": orjson is not None, "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+from common import ROOT, emit, summarize
+
+# Modules that must stay out of the import path; they are loaded on first use or by the warm-up.
+DEFERRED_MODULES = ("openai", "numpy", "reportlab.pdfgen.canvas", "reportlab.pdfbase.pdfmetrics")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+FIRST_HEALTH_SCRIPT = """
+import asyncio, sys, tempfile, time
+from pathlib import Path
+started = time.perf_counter()
+import app.db as db
+db.DATABASE_PATH = Path(tempfile.mkdtemp()) / "planner.db"
+from app.main import app
+import httpx
+
+async def main():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://planner.test") as client:
+            response = await client.get("/health")
+            assert response.status_code == 200
+            print(time.perf_counter() - started)
+
+asyncio.run(main())
+"""
+
+
+def run_python(arguments: list[str], env: dict[str, str]) -> subprocess.CompletedProcess[str]:
+    return subprocess.run([sys.executable, *arguments], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def import_profile(env: dict[str, str]) -> tuple[float, dict[str, int]]:
+    stderr = run_python(["-X", "importtime", "-c", "import app.main"], env).stderr
+    self_times: dict[str, int] = {}
+    total = 0.0
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        self_times[module] = int(self_us)
+        if module == "app.main":
+            total = int(cumulative_us) / 1_000_000
+    return total, self_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and time to the first /health.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2_000, help="Fail when the median app import exceeds this.")
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest modules to report.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    args = parser.parse_args()
+
+    env = {**os.environ, "STARTUP_WARMUP": "0", "PDF_CACHE_DIR": tempfile.mkdtemp(prefix="planner-startup-")}
+    # One throwaway run so every measured run reads warm bytecode caches.
+    run_python(["-c", "import app.main"], env)
+
+    import_times: list[float] = []
+    first_health: list[float] = []
+    process_wall: list[float] = []
+    self_times: dict[str, list[int]] = {}
+    for _ in range(args.runs):
+        total, modules = import_profile(env)
+        import_times.append(total)
+        for module, self_us in modules.items():
+            self_times.setdefault(module, []).append(self_us)
+
+        started = time.perf_counter()
+        output = run_python(["-c", FIRST_HEALTH_SCRIPT], env).stdout
+        process_wall.append(time.perf_counter() - started)
+        first_health.append(float(output.strip().splitlines()[-1]))
+
+    slowest = sorted(
+        ((module, statistics.median(samples) / 1_000) for module, samples in self_times.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    deferred_loaded = [module for module in DEFERRED_MODULES if module in self_times]
+    median_import_ms = statistics.median(import_times) * 1_000
+
+    failures: list[str] = []
+    if median_import_ms > args.budget_ms:
+        failures.append(f"app.main import took {median_import_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    for module in deferred_loaded:
+        failures.append(f"{module} is imported at startup")
+
+    results: dict[str, Any] = {
+        "suite": "startup",
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "results": {
+            "import_app_main": summarize(import_times),
+            "first_health_in_process": summarize(first_health),
+            "first_health_with_interpreter": summarize(process_wall),
+        },
+        "slowest_modules_ms": dict(slowest),
+        "deferred_modules_loaded": deferred_loaded,
+        "failures": failures,
+    }
+    emit(results, args.output)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from allocation import legacy_allocate_hours, random_cases  # noqa: E402
+
+from app.scoring import SubjectColumns, _numpy, _score_numpy, _score_python, apportion  # noqa: E402
+
+
+CASES = random_cases(2_000, seed=2024)
+
+
+@pytest.mark.parametrize("total_hours, pressures", CASES[:500])
+def test_apportion_spends_the_exact_budget(total_hours: int, pressures: list[float]) -> None:
+    hours = apportion(total_hours, pressures)
+    assert sum(hours) == total_hours
+    assert hours == apportion(total_hours, pressures)
+    assert hours == sorted(hours, reverse=True)
+    if total_hours >= len(pressures):
+        assert min(hours) >= 1
+
+
+@pytest.mark.parametrize("total_hours, pressures", CASES[:500])
+def test_apportion_half_hour_slots_spend_the_exact_budget(total_hours: int, pressures: list[float]) -> None:
+    hours = apportion(total_hours, pressures, granularity=0.5)
+    assert sum(hours) == pytest.approx(total_hours)
+    assert all(value * 2 == int(value * 2) for value in hours)
+
+
+def test_apportion_stays_on_budget_where_the_legacy_allocator_does_not() -> None:
+    legacy_off_budget = [
+        (total_hours, pressures)
+        for total_hours, pressures in CASES
+        if sum(legacy_allocate_hours(total_hours, pressures)) != total_hours
+    ]
+    assert legacy_off_budget
+    for total_hours, pressures in legacy_off_budget:
+        assert sum(apportion(total_hours, pressures)) == total_hours
+
+
+def random_columns(rng: random.Random, plans: int) -> SubjectColumns:
+    columns = SubjectColumns()
+    for plan in range(plans):
+        columns.study_styles.append(rng.choice(("Balanced", "Concept-first", "Practice-heavy")))
+        columns.weekly_hours.append(rng.randint(1, 60))
+        for index in range(rng.randint(1, 12)):
+            columns.names.append(f"Subject {index}")
+            columns.plan_index.append(plan)
+            columns.priority.append(rng.randint(1, 5))
+            columns.current_level.append(rng.randint(0, 100))
+            columns.target_level.append(rng.randint(0, 100))
+            columns.coverage.append(rng.randint(0, 100))
+            columns.mock_score.append(rng.randint(0, 100))
+    return columns
+
+
+@pytest.mark.skipif(_numpy() is None, reason="NumPy is not installed")
+@pytest.mark.parametrize("seed", range(20))
+def test_numpy_scoring_matches_python(seed: int) -> None:
+    columns = random_columns(random.Random(seed), plans=50)
+    expected = _score_python(columns)
+    actual = _score_numpy(columns)
+
+    assert actual.order == expected.order
+    assert actual.plan_index == expected.plan_index
+    assert actual.gap == expected.gap
+    assert actual.pressure == pytest.approx(expected.pressure)
+    assert actual.readiness == expected.readiness
+    assert actual.mode == expected.mode
+    assert actual.hours == expected.hours